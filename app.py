@@ -1,9 +1,7 @@
 import streamlit as st
-from database import KittenGuideDB
-from content_loader import load_sample_content
-import os
-import random
+from db_service import OPS_MANUAL_FLOW_ID, get_db, get_user_id, guide_count
 from datetime import datetime
+from ui import CAT_FACTS, CAT_WISDOMS, NAV_ITEMS, inject_css
 
 # Page configuration
 st.set_page_config(
@@ -13,172 +11,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# V2 CSS — vibrant, playful, warm palette
-st.markdown("""
-<style>
-    /* ---- Global palette ---- */
-    :root {
-        --cat-orange:  #F07A33;
-        --cat-teal:    #3AAFA9;
-        --cat-purple:  #7B5EA7;
-        --cat-red:     #E84040;
-        --cat-yellow:  #F5C842;
-        --cat-green:   #5BAD8B;
-        --cat-dark:    #2C2C3E;
-        --cat-light:   #FDF7F2;
-    }
-
-    /* ---- Hero header ---- */
-    .v2-hero {
-        background: linear-gradient(135deg, var(--cat-purple) 0%, var(--cat-orange) 100%);
-        border-radius: 16px;
-        padding: 2rem 2.5rem;
-        color: white;
-        margin-bottom: 1.5rem;
-    }
-    .v2-hero h1 { font-size: 2.8rem; margin: 0; font-weight: 900; letter-spacing: -1px; }
-    .v2-hero p  { font-size: 1.15rem; margin: 0.4rem 0 0; opacity: 0.92; }
-
-    /* ---- Wisdom card ---- */
-    .wisdom-card {
-        background: linear-gradient(120deg, #fff9f0 0%, #ffe8cc 100%);
-        border-left: 5px solid var(--cat-orange);
-        border-radius: 10px;
-        padding: 1rem 1.4rem;
-        margin-bottom: 1.2rem;
-        font-style: italic;
-        font-size: 1.05rem;
-        color: #3a2a00;
-    }
-
-    /* ---- Chaos meter ---- */
-    .chaos-bar-outer {
-        background: #e0e0e0;
-        border-radius: 20px;
-        height: 22px;
-        overflow: hidden;
-        margin: 0.4rem 0 0.2rem;
-    }
-    .chaos-bar-inner {
-        height: 100%;
-        border-radius: 20px;
-        background: linear-gradient(90deg, var(--cat-green), var(--cat-yellow), var(--cat-orange), var(--cat-red));
-        transition: width 0.5s ease;
-    }
-
-    /* ---- Panic buttons ---- */
-    .panic-label {
-        font-size: 0.78rem;
-        color: #666;
-        text-align: center;
-        margin-top: 2px;
-    }
-
-    /* ---- Guide cards ---- */
-    .guide-card-v2 {
-        border: none;
-        border-radius: 14px;
-        padding: 1.2rem 1.4rem;
-        margin: 0.6rem 0;
-        background: #fff;
-        box-shadow: 0 3px 12px rgba(0,0,0,0.08);
-        transition: box-shadow 0.2s;
-    }
-    .guide-card-v2:hover { box-shadow: 0 6px 20px rgba(0,0,0,0.14); }
-
-    /* ---- Urgency badges ---- */
-    .urgency-now {
-        background-color: var(--cat-red);
-        color: white;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.8rem;
-        display: inline-block;
-        margin-bottom: 0.3rem;
-    }
-    .urgency-today {
-        background-color: var(--cat-orange);
-        color: white;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.8rem;
-        display: inline-block;
-        margin-bottom: 0.3rem;
-    }
-    .urgency-monitor {
-        background-color: var(--cat-green);
-        color: white;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.8rem;
-        display: inline-block;
-        margin-bottom: 0.3rem;
-    }
-
-    /* ---- Topic badges ---- */
-    .topic-badge {
-        display: inline-block;
-        background-color: var(--cat-teal);
-        color: white;
-        padding: 0.2rem 0.55rem;
-        border-radius: 12px;
-        font-size: 0.78rem;
-        margin-right: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-
-    /* ---- Stats row ---- */
-    .stat-box {
-        background: white;
-        border-radius: 12px;
-        padding: 1rem;
-        text-align: center;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.07);
-    }
-    .stat-number { font-size: 2rem; font-weight: 900; color: var(--cat-purple); }
-    .stat-label  { font-size: 0.82rem; color: #666; }
-
-    /* ---- Nav cards ---- */
-    .nav-card {
-        border-radius: 12px;
-        padding: 0.9rem 1rem;
-        margin: 0.3rem 0;
-        background: var(--cat-light);
-        border-left: 4px solid var(--cat-orange);
-        font-size: 0.95rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# ── Cat wisdom pool ────────────────────────────────────────────────────────────
-CAT_WISDOMS = [
-    "🐾 *\"A kitten that hides under the bed is not plotting your downfall — they're just terrified. Give it 48 hours.\"*",
-    "🐾 *\"Your kitten does not hate you. They hate the new smell of everything, including you. This is temporary.\"*",
-    "🐾 *\"Zoomies at 2am are not a personal attack. They are a feature, not a bug. Play before bed to patch it.\"*",
-    "🐾 *\"The litter tray is a privilege, not a right. Keep it clean or accept the consequences on your duvet.\"*",
-    "🐾 *\"Hands are not toys. Hands are sacred. Your future self will thank you for establishing this rule now.\"*",
-    "🐾 *\"Cats do not meow at each other. They only meow at humans. Congratulations — you have been accepted.\"*",
-    "🐾 *\"If your kitten brings you a toy, they are teaching you to hunt. Be grateful. Pretend to be impressed.\"*",
-    "🐾 *\"Slow blinking back at a cat is the feline equivalent of a firm handshake and a genuine smile.\"*",
-    "🐾 *\"A purring kitten on your laptop is not an inconvenience. It is a privilege. Adjust your posture.\"*",
-    "🐾 *\"The cardboard box you were going to recycle is now a palace. Accept this. Order more things online.\"*",
-    "🐾 *\"Kittens sleep 16 hours a day. Humans average 7. They are clearly doing something right.\"*",
-    "🐾 *\"If a kitten shows you their belly, it is a test of your self-control. You will almost certainly fail.\"*",
-]
-
-# ── ASCII cat art ──────────────────────────────────────────────────────────────
-CAT_ART = r"""
-   /\_____/\
-  /  o   o  \
- ( ==  ^  == )
-  )         (
- (           )
-( (  )   (  ) )
-(__(__)___(__)__)
-"""
+# V2 CSS — vibrant, playful, warm palette (styles/app.css)
+inject_css("app")
 
 # ── Chaos level labels ─────────────────────────────────────────────────────────
 def chaos_level(manual_steps_done: int, bookmarks: int, total_steps: int = 10) -> tuple:
@@ -197,16 +31,8 @@ def chaos_level(manual_steps_done: int, bookmarks: int, total_steps: int = 10) -
         return pct, "Zen cat parent", "🧘"
 
 # ── Init database ──────────────────────────────────────────────────────────────
-@st.cache_resource
-def init_database():
-    """Initialise database and load sample content if needed."""
-    db_path = "kitten_guide.db"
-    db = KittenGuideDB(db_path)
-    if len(db.get_all_guides()) == 0:
-        load_sample_content(db)
-    return db
-
-db = init_database()
+# Shared with every page; loads the sample content on first run
+db = get_db()
 
 # ──────────────────────────────────────────────────────────────────────────────
 # HERO HEADER
@@ -227,23 +53,26 @@ st.markdown(f'<div class="wisdom-card">💬 <strong>Cat Wisdom of the Day</stron
 # ──────────────────────────────────────────────────────────────────────────────
 # STATS ROW
 # ──────────────────────────────────────────────────────────────────────────────
-all_guides = db.get_all_guides()
-bookmarked = db.get_bookmarked_guides()
-manual_done = len(st.session_state.get('ops_manual_progress', set()))
+total_guides = guide_count()
+user_id = get_user_id()
+bookmark_count = db.bookmark_count(user_id)
+ops_flow = db.get_step_flow(OPS_MANUAL_FLOW_ID)
+manual_total = len(ops_flow.steps) if ops_flow else 10
+manual_done = len(db.get_step_progress(user_id, OPS_MANUAL_FLOW_ID))
 guides_read = len(st.session_state.get('guides_read', set()))
 
 stat_c1, stat_c2, stat_c3, stat_c4 = st.columns(4)
 with stat_c1:
-    st.markdown(f'<div class="stat-box"><div class="stat-number">{len(all_guides)}</div>'
+    st.markdown(f'<div class="stat-box"><div class="stat-number">{total_guides}</div>'
                 f'<div class="stat-label">📚 guides available</div></div>', unsafe_allow_html=True)
 with stat_c2:
     st.markdown(f'<div class="stat-box"><div class="stat-number">{guides_read}</div>'
                 f'<div class="stat-label">👁️ guides read</div></div>', unsafe_allow_html=True)
 with stat_c3:
-    st.markdown(f'<div class="stat-box"><div class="stat-number">{len(bookmarked)}</div>'
+    st.markdown(f'<div class="stat-box"><div class="stat-number">{bookmark_count}</div>'
                 f'<div class="stat-label">⭐ saved</div></div>', unsafe_allow_html=True)
 with stat_c4:
-    st.markdown(f'<div class="stat-box"><div class="stat-number">{manual_done}/10</div>'
+    st.markdown(f'<div class="stat-box"><div class="stat-number">{manual_done}/{manual_total}</div>'
                 f'<div class="stat-label">✅ ops steps done</div></div>', unsafe_allow_html=True)
 
 st.markdown("")
@@ -251,7 +80,7 @@ st.markdown("")
 # ──────────────────────────────────────────────────────────────────────────────
 # CHAOS LEVEL METER
 # ──────────────────────────────────────────────────────────────────────────────
-chaos_pct, chaos_label, chaos_emoji = chaos_level(manual_done, len(bookmarked))
+chaos_pct, chaos_label, chaos_emoji = chaos_level(manual_done, bookmark_count, manual_total)
 st.markdown(f"#### {chaos_emoji} Current Kitten Chaos Level: **{chaos_label}**")
 st.markdown(f"""
 <div class="chaos-bar-outer">
@@ -295,9 +124,9 @@ with panic_col4:
 
 # Emergency expander
 with st.expander("🔴 **WHEN TO CALL VET NOW** — expand for red flags", expanded=False):
-    emergency_guide = db.get_guide("emergency-vet-now")
-    if emergency_guide:
-        st.markdown(emergency_guide.markdown_body)
+    emergency_html = db.get_guide_html("emergency-vet-now")
+    if emergency_html:
+        st.markdown(emergency_html.body_html, unsafe_allow_html=True)
 
 st.markdown("---")
 
@@ -307,7 +136,7 @@ st.markdown("---")
 st.markdown("### ✨ Start Here — the essentials")
 
 featured_ids = ["first-24-hours", "litter-tray-basics", "emergency-vet-now"]
-featured_guides = [db.get_guide(gid) for gid in featured_ids if db.get_guide(gid)]
+featured_guides = [guide for guide in map(db.get_guide, featured_ids) if guide]
 
 feat_cols = st.columns(len(featured_guides))
 for col, guide in zip(feat_cols, featured_guides):
@@ -341,16 +170,8 @@ st.markdown("---")
 # ──────────────────────────────────────────────────────────────────────────────
 st.markdown("### 🗺️ Where to next?")
 
-nav_items = [
-    ("📋", "Kitten Ops Manual", "Step-by-step onboarding — start here if the kitten arrived today", "pages/0_kitten_ops_manual.py"),
-    ("🔍", "Search",            "Find help for a specific crisis at 2am",                          "pages/1_search.py"),
-    ("📖", "Library",           "Browse every guide by topic — no panic required",                 "pages/2_library.py"),
-    ("⭐", "Saved",             "Your bookmarked guides — quick access in an emergency",            "pages/3_saved.py"),
-    ("🆘", "Emergency",        "When to ring the vet RIGHT NOW — keep this bookmarked",            "pages/4_emergency.py"),
-]
-
 nav_c1, nav_c2 = st.columns(2)
-for i, (icon, name, desc, page) in enumerate(nav_items):
+for i, (icon, name, desc, page) in enumerate(NAV_ITEMS):
     col = nav_c1 if i % 2 == 0 else nav_c2
     with col:
         st.markdown(f'<div class="nav-card">{icon} <strong>{name}</strong><br>'
@@ -364,21 +185,9 @@ for i, (icon, name, desc, page) in enumerate(nav_items):
 with st.sidebar:
     st.markdown("---")
     st.markdown("### 🐱 Cat Fact")
-    fun_facts = [
-        "Cats can make over 100 different sounds. Dogs can only make about 10.",
-        "A group of kittens is called a *kindle*. A group of adult cats is a *clowder*.",
-        "Cats spend 70% of their lives asleep. They are basically furry philosophers.",
-        "Your cat's nose print is unique — like a human fingerprint, but cuter.",
-        "Cats can't taste sweetness. They have no sweet taste receptors at all.",
-        "The technical term for a cat's hairball is a *trichobezoar*. It sounds more impressive than it is.",
-        "Cats always land on their feet due to a reflex called the *righting reflex* — but please don't test this.",
-        "Ancient Egyptians shaved their eyebrows in mourning when their cat died.",
-        "A cat called Stubbs was the mayor of Talkeetna, Alaska for 20 years.",
-        "Cats have 32 muscles in each ear. You have 6. They can hear you opening a crisp packet from two floors up.",
-    ]
     _fact_now = datetime.now()
-    fact_index = (_fact_now.timetuple().tm_yday + _fact_now.hour) % len(fun_facts)
-    st.info(fun_facts[fact_index])
+    fact_index = (_fact_now.timetuple().tm_yday + _fact_now.hour) % len(CAT_FACTS)
+    st.info(CAT_FACTS[fact_index])
     st.markdown("<small>*Updates hourly*</small>", unsafe_allow_html=True)
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,16 @@
+"""Benchmarks for the database layer, run against synthetic guide corpora.
+
+    python -m benchmarks run                          # 1k and 10k guides
+    python -m benchmarks run --sizes 1k,10k,100k,1m --out before.json
+    python -m benchmarks compare before.json after.json
+    python -m benchmarks load --sessions 16           # concurrent page journeys
+
+Corpora are generated by benchmarks.corpus from the shape of the bundled
+content pack (topic mix, urgency mix, body lengths, vocabulary), so numbers
+stay meaningful as content evolves. Results are JSON, tagged with the git
+commit, so a performance change can be measured against the commit before it.
+
+`load` is different: it drives the real pages through Streamlit's AppTest
+with many concurrent sessions (see benchmarks.load) and reports rerun
+latency per page and per interaction.
+"""
@@ -0,0 +1,158 @@
+"""Command line for the benchmark suite: `python -m benchmarks run|compare|load`."""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.corpus import format_size, parse_size
+from benchmarks.suite import FULL_SCAN_LIMIT, run
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def default_output(report: dict, prefix: str = "") -> Path:
+    """results/<prefix><timestamp>-<short commit>.json"""
+    commit = (report["environment"]["git"]["commit"] or "nogit")[:10]
+    if report["environment"]["git"]["dirty"]:
+        commit += "-dirty"
+    return RESULTS_DIR / f"{prefix}{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+
+
+def write_report(report: dict, out: str = None, prefix: str = "") -> Path:
+    """Write report to out, or a timestamped file under results/."""
+    output = Path(out) if out else default_output(report, prefix)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return output
+
+
+def command_run(args) -> int:
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        report = run(sizes, workdir, args.seed, args.repeat, args.full_scan_limit)
+    else:
+        with tempfile.TemporaryDirectory() as scratch:
+            report = run(sizes, Path(scratch), args.seed, args.repeat, args.full_scan_limit)
+
+    output = write_report(report, args.out)
+
+    for result in report["runs"]:
+        load = result["load"]
+        print(f"\n{format_size(result['size'])} guides: loaded in {load['seconds']}s "
+              f"({load['guides_per_second']} guides/s, {load['db_bytes'] / 1e6:.1f} MB "
+              f"+ {load['wal_bytes'] / 1e6:.1f} MB WAL)")
+        for name, stats in result["operations"].items():
+            if "skipped" in stats:
+                print(f"  {name:<30} skipped ({stats['skipped']})")
+            else:
+                print(f"  {name:<30} median {stats['median_ms']:>10.3f} ms  "
+                      f"p95 {stats['p95_ms']:>10.3f} ms")
+        cache = result.get("search_cache")
+        if cache:
+            print(f"  search cache: hit rate {cache['hit_rate']:.1%}, {cache['misses']} misses, "
+                  f"{cache['evictions']} evictions")
+    print(f"\nResults written to {output}")
+    return 0
+
+
+def command_compare(args) -> int:
+    """Print median latency of every operation in two reports side by side."""
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    base_runs = {result["size"]: result for result in base["runs"]}
+    print(f"base: {base['environment']['git']['commit']}  new: {new['environment']['git']['commit']}")
+    for result in new["runs"]:
+        previous = base_runs.get(result["size"])
+        if previous is None:
+            continue
+        print(f"\n{format_size(result['size'])} guides "
+              f"(load {previous['load']['seconds']}s -> {result['load']['seconds']}s)")
+        print(f"  {'operation':<30} {'base ms':>10} {'new ms':>10} {'change':>8}")
+        for name, stats in result["operations"].items():
+            before = previous["operations"].get(name, {})
+            if "median_ms" not in stats or "median_ms" not in before:
+                continue
+            change = stats["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            print(f"  {name:<30} {before['median_ms']:>10.3f} {stats['median_ms']:>10.3f} "
+                  f"{change:>7.2f}x")
+    return 0
+
+
+def _print_latencies(title: str, table: dict):
+    print(f"\n  {title:<32} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in table.items():
+        print(f"  {name:<32} {stats['calls']:>6} {stats['median_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+
+def command_load(args) -> int:
+    """Drive the pages with concurrent AppTest sessions and report rerun latency."""
+    # db_service reads KITTEN_GUIDE_DB at import, which happens inside the load run
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["KITTEN_GUIDE_DB"] = (
+            str(Path(args.db).resolve()) if args.db else os.path.join(scratch, "kitten_guide.db")
+        )
+        from benchmarks.load import run as run_load
+
+        report = run_load(args.sessions, args.journeys, args.journey, args.seed, args.timeout)
+    output = write_report(report, args.out, prefix="load-")
+
+    if "pages" in report:
+        print(f"\n{report['sessions']} sessions, {report['reruns']} reruns in "
+              f"{report['wall_seconds']}s ({report['reruns_per_second']} reruns/s); "
+              f"warm-up {report['warmup_ms']} ms")
+        _print_latencies("page", report["pages"])
+        _print_latencies("interaction", report["interactions"])
+    if report["error_count"]:
+        print(f"\n{report['error_count']} errors, e.g.:")
+        for error in report["errors"][:5]:
+            print(f"  {error.splitlines()[0]}")
+    print(f"\nResults written to {output}")
+    return 1 if report["error_count"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark synthetic corpora")
+    run_parser.add_argument("--sizes", default="1k,10k",
+                            help="comma-separated corpus sizes, e.g. 1k,10k,100k,1m")
+    run_parser.add_argument("--seed", type=int, default=0, help="corpus RNG seed")
+    run_parser.add_argument("--repeat", type=int, default=20,
+                            help="calls per query / id sample size multiplier")
+    run_parser.add_argument("--full-scan-limit", type=int, default=FULL_SCAN_LIMIT,
+                            help="largest corpus to run get_all_guides against")
+    run_parser.add_argument("--workdir", help="keep the benchmark databases here")
+    run_parser.add_argument("--out", help="results file (default: benchmarks/results/...)")
+    run_parser.set_defaults(handler=command_run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.set_defaults(handler=command_compare)
+
+    from benchmarks.load import JOURNEYS
+
+    load_parser = commands.add_parser("load", help="concurrent sessions through the real pages")
+    load_parser.add_argument("--sessions", type=int, default=8, help="simulated concurrent visitors")
+    load_parser.add_argument("--journeys", type=int, default=10, help="journeys per session")
+    load_parser.add_argument("--journey", action="append", choices=sorted(JOURNEYS),
+                             help="only run this journey (repeatable; default: all)")
+    load_parser.add_argument("--seed", type=int, default=0, help="journey RNG seed")
+    load_parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    load_parser.add_argument("--db", help="use this database instead of a fresh one")
+    load_parser.add_argument("--out", help="results file (default: benchmarks/results/load-...)")
+    load_parser.set_defaults(handler=command_load)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Synthetic guide corpora modelled on the bundled content pack.
+
+The profile (which topics appear and how often, how many per guide, the
+urgency mix, body lengths, age ranges, list lengths and the lines bodies are
+made of) is measured from content/guides at run time. Generated guides
+sample from it with a seeded RNG, so a given (size, seed) is reproducible and
+a corpus of any size can be streamed without holding it in memory.
+"""
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from content_loader import BUNDLED_CONTENT_DIR, iter_content_pack
+from models import Diagram, Guide
+
+# Urgency levels the app knows about; each gets a small floor weight so the
+# synthetic corpus exercises all of them even if the sample pack has none
+URGENCY_LEVELS = ("", "Monitor", "Today", "Now")
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """Parse a corpus size such as "1000", "10k" or "1m"."""
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """Inverse of parse_size for round numbers, e.g. 10000 -> "10k"."""
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return str(size)
+
+
+@dataclass
+class CorpusProfile:
+    """Distributions a synthetic corpus is drawn from."""
+    topics: List[str]
+    topic_weights: List[int]
+    topics_per_guide: List[int]
+    urgency_weights: List[int]
+    body_lengths: List[int]
+    age_ranges: List[Tuple[Optional[int], Optional[int]]]
+    diagrams_per_guide: List[int]
+    title_words: List[str]
+    body_lines: List[str]
+    do_items: List[str]
+    dont_items: List[str]
+    analogy_cards: List[str]
+
+    @classmethod
+    def from_content_pack(cls, directory=BUNDLED_CONTENT_DIR) -> "CorpusProfile":
+        """Measure a profile from a content pack (the bundled guides by default)."""
+        guides = list(iter_content_pack(directory))
+        if not guides:
+            raise ValueError(f"no guides found in {directory}")
+
+        topic_counts = Counter(topic for guide in guides for topic in guide.topics)
+        urgency_counts = Counter(guide.urgency for guide in guides)
+        return cls(
+            topics=list(topic_counts),
+            topic_weights=list(topic_counts.values()),
+            topics_per_guide=[len(guide.topics) for guide in guides],
+            urgency_weights=[urgency_counts.get(level, 0) + 1 for level in URGENCY_LEVELS],
+            body_lengths=[len(guide.markdown_body) for guide in guides],
+            age_ranges=[(guide.age_min_weeks, guide.age_max_weeks) for guide in guides],
+            diagrams_per_guide=[len(guide.diagrams) for guide in guides],
+            title_words=sorted({
+                word for guide in guides for word in re.findall(r"[A-Za-z']{3,}", guide.title)
+            }),
+            body_lines=[
+                line for guide in guides for line in guide.markdown_body.splitlines() if line.strip()
+            ],
+            do_items=[item for guide in guides for item in guide.do_list],
+            dont_items=[item for guide in guides for item in guide.dont_list],
+            analogy_cards=[card for guide in guides for card in guide.analogy_cards],
+        )
+
+
+def generate_guides(count: int, seed: int = 0,
+                    profile: Optional[CorpusProfile] = None) -> Iterator[Guide]:
+    """Stream count synthetic guides with ids bench-0000000, bench-0000001, ..."""
+    profile = profile or CorpusProfile.from_content_pack()
+    rng = random.Random(seed)
+    updated = datetime(2025, 1, 6)
+
+    for index in range(count):
+        guide_id = f"bench-{index:07d}"
+
+        # Distinct topics, biased towards the common ones
+        wanted = rng.choice(profile.topics_per_guide)
+        topics = []
+        while len(topics) < min(wanted, len(profile.topics)):
+            topic = rng.choices(profile.topics, profile.topic_weights)[0]
+            if topic not in topics:
+                topics.append(topic)
+
+        # Body: a heading then real lines from the pack, to a realistic length
+        target = int(rng.choice(profile.body_lengths) * rng.uniform(0.6, 1.4))
+        title = " ".join(rng.sample(profile.title_words, min(rng.randint(3, 7), len(profile.title_words))))
+        lines = [f"# {title.capitalize()}"]
+        length = len(lines[0])
+        while length < target:
+            line = rng.choice(profile.body_lines)
+            lines.append(line)
+            length += len(line) + 1
+
+        age_min, age_max = rng.choice(profile.age_ranges)
+        yield Guide(
+            id=guide_id,
+            title=title.capitalize(),
+            summary=rng.choice(profile.body_lines)[:160],
+            markdown_body="\n".join(lines) + "\n",
+            topics=topics,
+            age_min_weeks=age_min,
+            age_max_weeks=age_max,
+            urgency=rng.choices(URGENCY_LEVELS, profile.urgency_weights)[0],
+            analogy_cards=[rng.choice(profile.analogy_cards)] if profile.analogy_cards else [],
+            diagrams=[
+                Diagram(
+                    id=f"{guide_id}-diagram-{number}",
+                    asset_ref=f"bench_asset_{number}",
+                    alt=rng.choice(profile.body_lines)[:120],
+                    caption=rng.choice(profile.body_lines)[:80],
+                    hotspots=[f"hotspot-{number}-{spot}" for spot in range(3)],
+                )
+                for number in range(rng.choice(profile.diagrams_per_guide))
+            ],
+            updated_at=updated - timedelta(days=rng.randint(0, 365)),
+            do_list=rng.sample(profile.do_items, min(4, len(profile.do_items))),
+            dont_list=rng.sample(profile.dont_items, min(4, len(profile.dont_items))),
+        )
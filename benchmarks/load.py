@@ -0,0 +1,237 @@
+"""Concurrent-session load test: scripted journeys through the real pages.
+
+Each simulated visitor is a thread driving app.py and the pages with
+Streamlit's AppTest. All of them share one process, and so one get_db() store
+and connection pool, the way sessions share a `streamlit run` server. Every
+rerun is timed: a page's first render, or a widget interaction plus the
+rerun it triggers (including a switch_page to another page). The report gives
+p50/p95/p99 per page and per interaction, which a browser and the
+rerun-the-whole-script model otherwise hide.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+from unittest.mock import MagicMock, patch
+
+from benchmarks.suite import QUERIES, environment, summarise
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HOME = "app.py"
+SEARCH = "pages/1_search.py"
+VIEWER = "pages/guide_viewer.py"
+SAVED = "pages/3_saved.py"
+
+# The "help right now" buttons on the home page
+PANIC_BUTTONS = ["😿 Not eating", "🚽 Litter disasters", "😾 Biting/scratching", "🏃 Zoomies at 3am"]
+
+
+@contextmanager
+def shared_runtime():
+    """Let AppTests run on several threads at once.
+
+    AppTest.run() installs a mock Runtime singleton and a config override for
+    the length of one run and tears both down afterwards, so with concurrent
+    sessions the first to finish would pull the runtime out from under the
+    rest. This pins one runtime and the override for the whole load test.
+
+    Each AppTest run also compiles its page into a private script cache, and
+    compile() is not thread-safe on every Python version. A server shares one
+    cache between sessions, so the sessions here share one too.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+    from streamlit.testing.v1.util import patch_config_options
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    script_cache = ScriptCache()
+    with patch.object(Runtime, "instance", classmethod(lambda cls: runtime)), \
+            patch.object(Runtime, "exists", classmethod(lambda cls: True)), \
+            patch.object(local_script_runner, "ScriptCache", lambda: script_cache), \
+            patch_config_options({"global.appTest": True}):
+        yield script_cache
+
+
+class Session:
+    """One simulated visitor: a browser tab on the app, its timings and errors.
+
+    The AppTest is rooted at app.py like a real `streamlit run app.py`, so
+    session state carries across pages and st.switch_page resolves as it
+    does in production.
+    """
+
+    def __init__(self, number: int, guide_ids: Sequence[str], seed: int = 0, timeout: float = 60):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(str(ROOT / HOME), default_timeout=timeout)
+        self.app.session_state["user_id"] = f"load-{number:04d}"
+        self.guide_ids = guide_ids
+        self.rng = random.Random(f"{seed}-{number}")
+        # (page, interaction, seconds) per rerun
+        self.samples: List[tuple] = []
+        self.errors: List[str] = []
+
+    def rerun(self, page: str, interaction: str, run: Callable[[], object]):
+        """Time one rerun and record any exception the page raised."""
+        start = time.perf_counter()
+        run()
+        self.samples.append((page, interaction, time.perf_counter() - start))
+        for error in self.app.exception:
+            self.errors.append(f"{interaction} on {page}: {error.value}")
+
+    def open(self, page: str, interaction: str):
+        """Navigate to page, as a sidebar link does."""
+        self.app.switch_page(page)
+        self.rerun(page, interaction, self.app.run)
+
+    def click(self, page: str, interaction: str, button) -> bool:
+        """Click a button (None if the page didn't show it) and time the rerun."""
+        if button is None:
+            self.errors.append(f"{interaction} on {page}: button not found")
+            return False
+        self.rerun(page, interaction, button.click().run)
+        return True
+
+    def find_button(self, label: str = None, key_prefix: str = None):
+        """First button on the current page with this label or a key starting with key_prefix."""
+        for button in self.app.button:
+            if label is not None and button.label == label:
+                return button
+            if key_prefix is not None and (button.key or "").startswith(key_prefix):
+                return button
+        return None
+
+
+def panic_journey(session: Session):
+    """Home page, then one of the panic buttons straight into a guide."""
+    session.open(HOME, "panic: open home")
+    button = session.find_button(label=session.rng.choice(PANIC_BUTTONS))
+    session.click(HOME, "panic: tap panic button", button)
+
+
+def search_journey(session: Session):
+    """Type a search, then open the top result."""
+    session.open(SEARCH, "search: open search")
+    if not session.app.text_input:
+        session.errors.append("search: type query on search page: search box not found")
+        return
+    query = session.rng.choice(QUERIES)
+    session.rerun(SEARCH, "search: type query", session.app.text_input[0].input(query).run)
+    result = session.find_button(key_prefix="search_")
+    if result is not None:
+        session.click(SEARCH, "search: read result", result)
+
+
+def read_journey(session: Session):
+    """Open a guide and follow one of its related guides."""
+    session.app.session_state["selected_guide"] = session.rng.choice(session.guide_ids)
+    session.open(VIEWER, "read: open guide")
+    related = session.find_button(key_prefix="related_")
+    if related is not None:
+        session.click(VIEWER, "read: related guide", related)
+
+
+def bookmark_journey(session: Session):
+    """Open a guide, toggle its bookmark and look at the saved list."""
+    session.app.session_state["selected_guide"] = session.rng.choice(session.guide_ids)
+    session.open(VIEWER, "bookmark: open guide")
+    toggle = session.find_button(label="☆ Save") or session.find_button(label="⭐ Saved")
+    session.click(VIEWER, "bookmark: toggle save", toggle)
+    session.open(SAVED, "bookmark: open saved")
+
+
+JOURNEYS = {
+    "panic": panic_journey,
+    "search": search_journey,
+    "read": read_journey,
+    "bookmark": bookmark_journey,
+}
+
+
+def _run_session(session: Session, journeys: Sequence[str], count: int, start: threading.Barrier):
+    """Thread body: wait for every session to be ready, then run count journeys."""
+    start.wait()
+    for _ in range(count):
+        name = session.rng.choice(journeys)
+        try:
+            JOURNEYS[name](session)
+        except Exception as error:  # keep the other sessions going, report it at the end
+            session.errors.append(f"{name}: {type(error).__name__}: {error}")
+
+
+def run(sessions: int = 8, journeys_per_session: int = 10, journeys: Optional[Sequence[str]] = None,
+        seed: int = 0, timeout: float = 60, log=print) -> Dict[str, object]:
+    """Run the load test against the database db_service is configured with.
+
+    KITTEN_GUIDE_DB must point at the database to use before this is called;
+    db_service reads it at import.
+    """
+    journeys = list(journeys or JOURNEYS)
+    with shared_runtime() as script_cache:
+        # The first render opens the store and syncs content; time it, but keep
+        # it out of the steady-state numbers, along with compiling the pages
+        log("warm-up: first render of the home page")
+        warmup = Session(0, [], seed, timeout)
+        warmup.open(HOME, "warm-up")
+        if warmup.errors:
+            return {"environment": environment(), "errors": warmup.errors, "error_count": len(warmup.errors)}
+
+        import db_service
+        from database import KittenGuideDB
+
+        db = KittenGuideDB(db_service.DB_PATH, pool_size=1)
+        guide_ids = [summary.id for summary in db.get_guide_summaries()]
+        db.close()
+        for page in (ROOT / "pages").glob("*.py"):
+            script_cache.get_bytecode(str(page))
+
+        log(f"{sessions} sessions x {journeys_per_session} journeys ({', '.join(journeys)})")
+        simulated = [Session(number, guide_ids, seed, timeout) for number in range(1, sessions + 1)]
+        barrier = threading.Barrier(sessions + 1)
+        threads = [
+            threading.Thread(target=_run_session, args=(session, journeys, journeys_per_session, barrier),
+                             name=f"load-session-{number}")
+            for number, session in enumerate(simulated, start=1)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - start
+
+    by_page: Dict[str, List[float]] = {}
+    by_interaction: Dict[str, List[float]] = {}
+    for session in simulated:
+        for page, interaction, seconds in session.samples:
+            by_page.setdefault(page, []).append(seconds)
+            by_interaction.setdefault(interaction, []).append(seconds)
+    errors = [error for session in simulated for error in session.errors]
+    reruns = sum(len(session.samples) for session in simulated)
+
+    return {
+        "environment": environment(),
+        "sessions": sessions,
+        "journeys_per_session": journeys_per_session,
+        "journeys": journeys,
+        "seed": seed,
+        "guides": len(guide_ids),
+        "warmup_ms": round(warmup.samples[0][2] * 1000, 1),
+        "wall_seconds": round(wall_seconds, 3),
+        "reruns": reruns,
+        "reruns_per_second": round(reruns / wall_seconds, 1) if wall_seconds else None,
+        "pages": {page: summarise(samples) for page, samples in sorted(by_page.items())},
+        "interactions": {name: summarise(samples) for name, samples in sorted(by_interaction.items())},
+        "error_count": len(errors),
+        "errors": errors[:50],
+    }
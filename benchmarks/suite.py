@@ -0,0 +1,257 @@
+"""Timed runs of every KittenGuideDB operation against one synthetic corpus."""
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarks.corpus import CorpusProfile, format_size, generate_guides
+from database import KittenGuideDB, listing_cursor, search_cursor
+
+# Searches modelled on what people type at 2am: single words, phrases,
+# stemmed forms and a miss
+QUERIES = [
+    "litter",
+    "not eating",
+    "biting hands",
+    "zoomies at night",
+    "vet emergency breathing",
+    "scratching furniture",
+    "carriers",
+    "xylophone",
+]
+
+# What people have typed so far when autocomplete runs
+PREFIXES = ["l", "li", "lit", "litter ", "vet", "zo", "ki", "s", "q"]
+
+# Filters exercised alongside the queries above
+TOPIC_FILTER = "Health"
+TOPICS_FILTER = ["Play", "Sleep"]
+URGENCY_FILTER = "Now"
+AGE_FILTER = 9  # weeks
+
+# Rows per page for the keyset-paginated listings
+PAGE_SIZE = 10
+
+# get_all_guides hydrates every guide; beyond this many it needs gigabytes of
+# memory, so larger corpora skip it unless the limit is raised
+FULL_SCAN_LIMIT = 100_000
+
+BENCH_USER = "bench"
+
+
+def git_commit() -> Dict[str, object]:
+    """Current commit and whether the tree has uncommitted changes, if in a git checkout."""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=root, capture_output=True, text=True, check=True,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def environment() -> Dict[str, object]:
+    """Where a run happened, recorded so results from different machines aren't mixed up."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_commit(),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def summarise(samples: Sequence[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    millis = [sample * 1000 for sample in ordered]
+    return {
+        "calls": len(millis),
+        "mean_ms": round(statistics.fmean(millis), 4),
+        "median_ms": round(statistics.median(millis), 4),
+        "p95_ms": round(millis[min(len(millis) - 1, int(len(millis) * 0.95))], 4),
+        "p99_ms": round(millis[min(len(millis) - 1, int(len(millis) * 0.99))], 4),
+        "min_ms": round(millis[0], 4),
+        "max_ms": round(millis[-1], 4),
+    }
+
+
+def timed(calls: Sequence[Callable[[], object]]) -> Dict[str, float]:
+    """Run each call once, timing them individually."""
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return summarise(samples)
+
+
+def _file_size(path: Path) -> int:
+    """Size of path in bytes, 0 if it doesn't exist."""
+    return path.stat().st_size if path.exists() else 0
+
+
+def run_size(size: int, workdir: Path, seed: int = 0, repeat: int = 20,
+             profile: Optional[CorpusProfile] = None,
+             full_scan_limit: int = FULL_SCAN_LIMIT, log=print) -> Dict[str, object]:
+    """Load a corpus of size guides into a fresh database and time every operation."""
+    db_path = workdir / f"bench-{format_size(size)}-{seed}.db"
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    # The search ops time the queries themselves, so this store has no search
+    # result cache; the "[cached]" ops go through a second, cached one
+    db = KittenGuideDB(str(db_path), search_cache_size=0)
+    rng = random.Random(seed)
+    guide_ids = [f"bench-{index:07d}" for index in rng.sample(range(size), min(size, repeat * 5))]
+    ops: Dict[str, object] = {}
+
+    log(f"[{format_size(size)}] bulk load")
+    start = time.perf_counter()
+    written = db.add_guides(generate_guides(size, seed, profile), batch_size=10_000)
+    load_seconds = time.perf_counter() - start
+    load = {
+        "guides": written,
+        "seconds": round(load_seconds, 3),
+        "guides_per_second": round(written / load_seconds, 1) if load_seconds else None,
+        "db_bytes": _file_size(db_path),
+        "wal_bytes": _file_size(Path(f"{db_path}-wal")),
+    }
+
+    log(f"[{format_size(size)}] search")
+    ops["search_guides"] = timed([
+        lambda query=query: db.search_guides(query) for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_guides[topic]"] = timed([
+        lambda query=query: db.search_guides(query, topic=TOPIC_FILTER)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_guides[topics]"] = timed([
+        lambda query=query: db.search_guides(query, topic=TOPICS_FILTER)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_guides[urgency]"] = timed([
+        lambda query=query: db.search_guides(query, urgency=URGENCY_FILTER)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_guides[age]"] = timed([
+        lambda query=query: db.search_guides(query, age_weeks=AGE_FILTER)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_count"] = timed([
+        lambda query=query: db.search_count(query) for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_faceted"] = timed([
+        lambda query=query: db.search_faceted(query, limit=PAGE_SIZE) for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_faceted[filtered]"] = timed([
+        lambda query=query: db.search_faceted(
+            query, {"topic": TOPIC_FILTER, "urgency": URGENCY_FILTER}, limit=PAGE_SIZE
+        )
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["suggest"] = timed([
+        lambda prefix=prefix: db.suggest(prefix) for prefix in PREFIXES for _ in range(repeat)
+    ])
+    # A later page: resume after the last result of the first page
+    search_cursors = {}
+    for query in QUERIES:
+        first_page = db.search_guides(query, limit=PAGE_SIZE)
+        if first_page:
+            search_cursors[query] = search_cursor(first_page[-1])
+    ops["search_guides[page 2]"] = timed([
+        lambda query=query, after=after: db.search_guides(query, after=after, limit=PAGE_SIZE)
+        for query, after in search_cursors.items() for _ in range(repeat)
+    ])
+
+    # Every query repeated against a cached store: the first run of each misses
+    cached = KittenGuideDB(str(db_path), pool_size=1)
+    ops["search_guides[cached]"] = timed([
+        lambda query=query: cached.search_guides(query, limit=PAGE_SIZE)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    ops["search_faceted[cached]"] = timed([
+        lambda query=query: cached.search_faceted(query, limit=PAGE_SIZE)
+        for query in QUERIES for _ in range(repeat)
+    ])
+    search_cache = cached.search_cache_stats()
+    cached.close()
+
+    log(f"[{format_size(size)}] guide reads")
+    # Cold: distinct ids not read before, so every call misses the guide cache
+    ops["get_guide[cold]"] = timed([lambda guide_id=guide_id: db.get_guide(guide_id)
+                                    for guide_id in guide_ids])
+    ops["get_guide[warm]"] = timed([lambda: db.get_guide(guide_ids[0])] * (repeat * 5))
+    ops["get_guide_html"] = timed([lambda guide_id=guide_id: db.get_guide_html(guide_id)
+                                   for guide_id in guide_ids])
+    ops["get_related"] = timed([lambda guide_id=guide_id: db.get_related(guide_id, k=3)
+                                for guide_id in guide_ids])
+    ops["get_diagrams"] = timed([lambda: db.get_diagrams(guide_ids)] * repeat)
+    ops["guide_count"] = timed([db.guide_count] * repeat)
+    ops["topic_counts"] = timed([db.topic_counts] * repeat)
+    ops["get_guide_summaries"] = timed([db.get_guide_summaries] * max(1, repeat // 10))
+    ops["get_guide_summaries[topic]"] = timed(
+        [lambda: db.get_guide_summaries(topic=TOPIC_FILTER)] * max(1, repeat // 10)
+    )
+    ops["get_guide_summaries[page 1]"] = timed(
+        [lambda: db.get_guide_summaries(limit=PAGE_SIZE)] * repeat
+    )
+    ops["get_guide_summaries[age page]"] = timed(
+        [lambda: db.get_guide_summaries(age_weeks=AGE_FILTER, limit=PAGE_SIZE)] * repeat
+    )
+    ops["guide_count[age]"] = timed([lambda: db.guide_count(age_weeks=AGE_FILTER)] * repeat)
+    # Deep in the listing: resuming after a random guide should cost the same as page 1
+    ops["get_guide_summaries[later page]"] = timed([
+        lambda after=listing_cursor(db.get_guide(guide_id)): db.get_guide_summaries(after=after, limit=PAGE_SIZE)
+        for guide_id in guide_ids
+    ])
+    if size <= full_scan_limit:
+        ops["get_all_guides"] = timed([db.get_all_guides] * max(1, repeat // 10))
+    else:
+        ops["get_all_guides"] = {"skipped": f"over full-scan limit of {full_scan_limit}"}
+
+    log(f"[{format_size(size)}] bookmarks")
+    ops["add_bookmark"] = timed([lambda guide_id=guide_id: db.add_bookmark(guide_id, BENCH_USER)
+                                 for guide_id in guide_ids])
+    ops["is_bookmarked"] = timed([lambda guide_id=guide_id: db.is_bookmarked(guide_id, BENCH_USER)
+                                  for guide_id in guide_ids])
+    ops["are_bookmarked"] = timed([lambda: db.are_bookmarked(BENCH_USER, guide_ids)] * repeat)
+    ops["bookmark_count"] = timed([lambda: db.bookmark_count(BENCH_USER)] * repeat)
+    ops["get_bookmarked_guides"] = timed([lambda: db.get_bookmarked_guides(BENCH_USER)] * repeat)
+    ops["get_bookmarked_summaries"] = timed(
+        [lambda: db.get_bookmarked_summaries(BENCH_USER)] * repeat
+    )
+    ops["remove_bookmark"] = timed([lambda guide_id=guide_id: db.remove_bookmark(guide_id, BENCH_USER)
+                                    for guide_id in guide_ids])
+
+    log(f"[{format_size(size)}] incremental update")
+    # Re-ingest a handful of existing guides with new content, as a content edit would
+    edited = list(generate_guides(min(size, 10), seed + 1, profile))
+    ops["add_guide[update]"] = timed([lambda guide=guide: db.add_guide(guide) for guide in edited])
+
+    db.close()
+    return {"size": size, "seed": seed, "load": load, "operations": ops, "search_cache": search_cache}
+
+
+def run(sizes: List[int], workdir: Path, seed: int = 0, repeat: int = 20,
+        full_scan_limit: int = FULL_SCAN_LIMIT, log=print) -> Dict[str, object]:
+    """Benchmark each corpus size in turn, returning the full JSON-ready report."""
+    profile = CorpusProfile.from_content_pack()
+    runs = [
+        run_size(size, workdir, seed, repeat, profile, full_scan_limit, log)
+        for size in sizes
+    ]
+    return {"environment": environment(), "repeat": repeat, "runs": runs}
@@ -0,0 +1,203 @@
+"""Small in-process caches used by the database layer."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe bounded least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Cache value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters plus current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class VersionedCache(LRUCache):
+    """LRU cache that empties itself whenever the data version it was filled at changes."""
+
+    def __init__(self, maxsize: int = 256):
+        super().__init__(maxsize)
+        self.version: Optional[Hashable] = None
+        self.invalidations = 0
+
+    def sync(self, version: Hashable):
+        """Clear the cache if version differs from the one it currently holds."""
+        with self._lock:
+            if version != self.version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self.version = version
+
+    def put(self, key: Hashable, value: Any, version: Optional[Hashable] = None):
+        """Cache value, unless it was read at a version the cache has since moved past."""
+        if version is not None and version != self.version:
+            return
+        super().put(key, value)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+class _Flight:
+    """One in-progress load that callers missing on the same key wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache(VersionedCache):
+    """Versioned LRU cache whose entries also expire ttl seconds after being
+    stored, with single-flight loading.
+
+    get_or_load runs the loader once per key however many callers miss on it
+    at the same time: the first caller loads, the rest wait for its result
+    (counted as coalesced) instead of repeating the work. A ttl of None keeps
+    entries until they are evicted or the version changes.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive (or None for no expiry)")
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._clock = clock
+        # (version, key) -> load in progress; keyed by version so a caller at a
+        # new version never waits on a load that read the old one
+        self._flights: Dict[Tuple[Hashable, Hashable], _Flight] = {}
+        self.expirations = 0
+        self.coalesced = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """(found, value) for key, dropping it if expired; the lock must be held."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires is None or self._clock() < expires:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._data[key]
+            self.expirations += 1
+        return False, None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the unexpired cached value for key (marking it recently used), or default."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any, version: Optional[Hashable] = None):
+        """Cache value until it expires, unless it was read at a version since moved past."""
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        super().put(key, (expires, value), version=version)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any], version: Hashable) -> Any:
+        """Return the cached value for key, calling load() to fill it on a miss.
+
+        The cache is synced to version first. Concurrent misses on the same key
+        share one load() call; if it raises, every waiting caller gets the error
+        and nothing is cached.
+        """
+        self.sync(version)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            flight = self._flights.get((version, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(version, key)] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+        except BaseException as error:
+            flight.error = error
+            raise
+        else:
+            self.put(key, flight.value, version=version)
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop((version, key), None)
+            flight.done.set()
+
+    def stats(self) -> dict:
+        """Counters as for VersionedCache, plus expirations and coalesced waits.
+
+        hit_rate counts coalesced callers as lookups that were not hits, so it
+        is the share of calls answered straight from the cache.
+        """
+        stats = super().stats()
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            stats.update({
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            })
+        return stats
@@ -1,23 +1,929 @@
 """Database management for offline-first kitten-care content."""
 import sqlite3
+import hashlib
+import heapq
 import json
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, replace
 from datetime import datetime
-from typing import List, Optional
-from models import Guide, StepFlow, Step, ChecklistItem, Diagram, Bookmark
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from caching import TTLCache, VersionedCache
+from instrumentation import InstrumentedConnection, QueryMetrics, instrument_methods
+from models import (
+    Guide, GuideSummary, RenderedGuide, StepFlow, Step, ChecklistItem, Diagram, Bookmark,
+    FacetedSearch, SearchResult, Suggestion,
+)
+from rendering import render_do_dont, render_markdown
 
 
+# BM25 column weights for the full-text index: title > tags > body
+FTS_TITLE_WEIGHT = 10.0
+FTS_TAGS_WEIGHT = 5.0
+FTS_BODY_WEIGHT = 1.0
+
+# Flat bonus for the best field a guide matched in, so ranking stays
+# title > tags > body even when BM25 has little to go on (small corpora)
+TITLE_MATCH_BONUS = 2.0
+TAGS_MATCH_BONUS = 1.0
+
+# How much each point of urgency_boost adds to a relevance score
+URGENCY_WEIGHT = 0.5
+
+# Urgency levels, most urgent first
+URGENCY_LEVELS = ("Now", "Today", "Monitor")
+
+# Filters search_faceted takes and counts matches for
+FACETS = ("topic", "urgency", "age")
+
+# Age buckets for the "age" facet as (label, min weeks, max weeks), inclusive;
+# None is open-ended. A guide counts in every bucket its age range overlaps
+AGE_BUCKETS = (
+    ("Under 8 weeks", 0, 7),
+    ("8-11 weeks", 8, 11),
+    ("3-6 months", 12, 25),
+    ("6-12 months", 26, 52),
+    ("Over a year", 53, None),
+)
+
+# Columns of the guides table in the order _row_to_guide expects
+GUIDE_COLUMNS = (
+    "id", "title", "summary", "markdown_body", "topics", "age_min_weeks",
+    "age_max_weeks", "urgency", "analogy_cards", "do_list", "dont_list", "updated_at",
+)
+
+
+# Columns behind a GuideSummary: no body, and only the first analogy card
+SUMMARY_COLUMNS = (
+    "id", "title", "summary", "urgency", "age_min_weeks", "age_max_weeks", "topics",
+)
+
+
+# Owner of bookmarks and progress when no user id is given (single-user installs)
+DEFAULT_USER_ID = "local"
+
+# Stored upper bound of the age index for guides with no maximum age, in weeks
+AGE_OPEN_WEEKS = 9999
+
+# Schema migrations, applied in order when a database is opened. Each entry
+# brings the file up to that PRAGMA user_version and is a list of SQL
+# statements or callables taking a cursor. Append new entries; never edit
+# one that has shipped, as existing kitten_guide.db files have already run it.
+MIGRATIONS = [
+    (1, [
+        # Secondary indexes for every filter, join and ORDER BY in this module
+        "CREATE INDEX IF NOT EXISTS idx_guides_title ON guides(title)",
+        "CREATE INDEX IF NOT EXISTS idx_guides_urgency ON guides(urgency)",
+        "CREATE INDEX IF NOT EXISTS idx_search_index_topic ON search_index(topic)",
+        "CREATE INDEX IF NOT EXISTS idx_bookmarks_created_at ON bookmarks(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_diagrams_guide_id ON diagrams(guide_id)",
+        "CREATE INDEX IF NOT EXISTS idx_steps_flow_id ON steps(flow_id, step_order)",
+        "CREATE INDEX IF NOT EXISTS idx_checklist_items_step_id ON checklist_items(step_id)",
+    ]),
+    (2, [
+        # One row per (guide, topic) so every topic - not just the first - is
+        # filterable and countable in SQL
+        """
+        CREATE TABLE IF NOT EXISTS guide_topics (
+            guide_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            PRIMARY KEY (guide_id, topic),
+            FOREIGN KEY (guide_id) REFERENCES guides(id)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_guide_topics_topic ON guide_topics(topic, guide_id)",
+        """
+        INSERT OR IGNORE INTO guide_topics (guide_id, topic)
+        SELECT g.id, t.value FROM guides g, json_each(g.topics) t
+        WHERE json_valid(g.topics)
+        """,
+    ]),
+    (3, [
+        # Step flows link to guides and keep checklist order; progress is per user
+        "ALTER TABLE steps ADD COLUMN guide_id TEXT",
+        "ALTER TABLE checklist_items ADD COLUMN item_order INTEGER",
+        """
+        CREATE TABLE IF NOT EXISTS step_progress (
+            user_id TEXT NOT NULL,
+            flow_id TEXT NOT NULL,
+            step_id TEXT NOT NULL,
+            completed_at TEXT,
+            PRIMARY KEY (user_id, flow_id, step_id)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (4, [
+        # Bookmarks belong to a user; bookmarks from before this migration were
+        # shared by everyone and are kept under DEFAULT_USER_ID
+        """
+        CREATE TABLE bookmarks_by_user (
+            user_id TEXT NOT NULL,
+            guide_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (user_id, guide_id),
+            FOREIGN KEY (guide_id) REFERENCES guides(id)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO bookmarks_by_user (user_id, guide_id, created_at)
+        SELECT 'local', guide_id, COALESCE(created_at, '') FROM bookmarks
+        """,
+        "DROP TABLE bookmarks",
+        "ALTER TABLE bookmarks_by_user RENAME TO bookmarks",
+        # Serves "newest first" listings and keyset pages per user
+        """
+        CREATE INDEX IF NOT EXISTS idx_bookmarks_user_created
+        ON bookmarks(user_id, created_at DESC, guide_id DESC)
+        """,
+    ]),
+    (5, [
+        # Related guides are worked out at ingest time, not on every page view
+        """
+        CREATE TABLE IF NOT EXISTS related_guides (
+            guide_id TEXT NOT NULL,
+            related_id TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (guide_id, related_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_related_guides_rank
+        ON related_guides(guide_id, score DESC, related_id)
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_related_guides_related ON related_guides(related_id)",
+        # Filled for existing guides by migration 14, once the columns the
+        # ranking reads exist
+    ]),
+    (6, [
+        # Content hash per guide so a sync only rewrites guides that changed.
+        # Existing rows start NULL and are rewritten once by the next sync.
+        "ALTER TABLE guides ADD COLUMN content_hash TEXT",
+        # Covers the (id, content_hash) manifest read without touching bodies
+        "CREATE INDEX IF NOT EXISTS idx_guides_content_hash ON guides(id, content_hash)",
+    ]),
+    (7, [
+        # Files each content pack was last loaded from, so a reload only
+        # reads files whose mtime or size moved
+        """
+        CREATE TABLE IF NOT EXISTS content_files (
+            pack TEXT NOT NULL,
+            path TEXT NOT NULL,
+            guide_id TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            PRIMARY KEY (pack, path)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (8, [
+        # Guide HTML rendered at ingest, keyed by content hash so an edit
+        # can never be served stale HTML and identical content renders once
+        """
+        CREATE TABLE IF NOT EXISTS rendered_guides (
+            content_hash TEXT PRIMARY KEY,
+            body_html TEXT NOT NULL,
+            do_dont_html TEXT NOT NULL
+        ) WITHOUT ROWID
+        """,
+        lambda cursor: _render_stored_guides(cursor),
+    ]),
+    (9, [
+        # Revision of guide and flow content, bumped in the same transaction
+        # as every content write, so caches can be keyed on it across
+        # processes without bookmark or progress writes flushing them
+        """
+        CREATE TABLE IF NOT EXISTS content_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO content_revision (id, revision) VALUES (1, 0)",
+    ]),
+    (10, [
+        # Listing order (most urgent first, then title, then id) as one
+        # ascending index, so keyset pages are an index seek: urgency_rank
+        # is minus the urgency boost
+        "ALTER TABLE guides ADD COLUMN urgency_rank INTEGER NOT NULL DEFAULT 0",
+        """
+        UPDATE guides SET urgency_rank = -COALESCE(
+            (SELECT urgency_boost FROM search_index WHERE doc_id = guides.id), 0
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_guides_listing ON guides(urgency_rank, title, id)",
+    ]),
+    (11, [
+        # Interval index over each guide's age range, keyed by guides.rowid
+        # (kept in step on every write, like search_fts), so "relevant to a
+        # 9-week-old" is an R*Tree search rather than a scan. Open ends are
+        # stored as 0 and AGE_OPEN_WEEKS
+        "CREATE VIRTUAL TABLE IF NOT EXISTS guide_ages USING rtree_i32(id, age_min, age_max)",
+        f"""
+        INSERT INTO guide_ages (id, age_min, age_max)
+        SELECT rowid, COALESCE(age_min_weeks, 0), COALESCE(age_max_weeks, {AGE_OPEN_WEEKS})
+        FROM guides
+        """,
+    ]),
+    (12, [
+        # Autocomplete vocabulary: titles, topics, do-list tips and body words,
+        # each with the number of guides it comes from. Prefix lookups are a
+        # range scan of the primary key
+        """
+        CREATE TABLE IF NOT EXISTS suggestions (
+            term TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            display TEXT NOT NULL,
+            guides INTEGER NOT NULL,
+            PRIMARY KEY (term, kind)
+        ) WITHOUT ROWID
+        """,
+        lambda cursor: _rebuild_suggestions(cursor),
+    ]),
+    (13, [
+        # Re-render guide HTML with blank lines between blocks, so st.markdown
+        # no longer splits ASCII charts in <pre> blocks when it parses the
+        # fragment again
+        "DELETE FROM rendered_guides",
+        lambda cursor: _render_stored_guides(cursor),
+        lambda cursor: _bump_revision(cursor),
+    ]),
+    (14, [
+        # Each guide's topic set as one sortable key, so related-guide refreshes
+        # read the few lowest ids of every (topic set, urgency) group from an
+        # index instead of every guide's topics
+        "ALTER TABLE guides ADD COLUMN topic_key TEXT NOT NULL DEFAULT ''",
+        lambda cursor: cursor.executemany(
+            "UPDATE guides SET topic_key = ? WHERE id = ?",
+            [(_topic_key(topics.split("\x1f")), guide_id) for guide_id, topics in cursor.execute(
+                "SELECT guide_id, group_concat(topic, char(31)) FROM guide_topics GROUP BY guide_id"
+            ).fetchall()],
+        ),
+        "CREATE INDEX IF NOT EXISTS idx_guides_topic_key ON guides(topic_key, urgency_rank, id)",
+        lambda cursor: _rebuild_related(cursor),
+    ]),
+    (15, [
+        # Content file manifests were keyed by the pack's absolute directory,
+        # which orphaned them whenever an install moved. The loader now keys
+        # them by a stable name; the next sync re-reads each file once to
+        # rebuild the manifest, and rewrites no guide whose content is unchanged
+        "DELETE FROM content_files",
+    ]),
+    (16, [
+        # Content hash per step flow, so a flow sync only rewrites flows whose
+        # file changed. Existing rows start NULL and are rewritten once
+        "ALTER TABLE step_flows ADD COLUMN content_hash TEXT",
+    ]),
+]
+
+# Related guides kept per guide, and how much each point of the related
+# guide's urgency_boost adds to its shared-topic count
+RELATED_KEEP = 10
+RELATED_URGENCY_WEIGHT = 0.25
+
+# Joins a guide's sorted topics into guides.topic_key
+TOPIC_KEY_SEPARATOR = "\x1f"
+
+# Vocabulary words a search's last (possibly half-typed) word is expanded to
+PREFIX_COMPLETIONS = 32
+
+# Most ids bound into one IN (...) list; older SQLite builds cap variables at 999
+MAX_IN_PARAMS = 500
+
+# Autocomplete kinds and how much each guide behind a suggestion of that kind
+# counts when ranking: a topic beats a title, a title beats a tip, and so on
+SUGGESTION_WEIGHTS = {"topic": 4, "title": 3, "tip": 2, "word": 1}
+
+# Body vocabulary offered as suggestions: words of three or more letters,
+# less the commonest function words
+SUGGESTION_WORD_PATTERN = re.compile(r"[a-z][a-z']+[a-z]")
+SUGGESTION_STOPWORDS = frozenset("""
+    the and for you your with that this are was but can has have its it's from they
+    them their then than what when will just into out our all any about also been
+""".split())
+
+# Schema version a fully migrated database reports
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _urgency_boost(urgency: str) -> int:
+    """Search ranking boost for a guide's urgency level."""
+    return 3 if urgency == "Now" else (2 if urgency == "Today" else 0)
+
+
+def listing_cursor(guide: Union[Guide, GuideSummary]) -> Tuple[int, str, str]:
+    """The keyset cursor (urgency_boost, title, id) after this guide in a listing.
+    
+    Pass it as `after` to get_all_guides or get_guide_summaries for the next page.
+    """
+    return (_urgency_boost(guide.urgency), guide.title, guide.id)
+
+
+def search_cursor(result: SearchResult) -> Tuple[float, str, str]:
+    """The keyset cursor (score, title, id) after this result, for search_guides."""
+    return (result.score, result.guide.title, result.guide.id)
+
+
+def _guide_columns(alias: str = "") -> str:
+    """Comma-separated guides columns, optionally qualified with a table alias."""
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + column for column in GUIDE_COLUMNS)
+
+
+def _summary_columns(alias: str = "") -> str:
+    """Projection for GuideSummary rows, optionally qualified with a table alias."""
+    prefix = f"{alias}." if alias else ""
+    columns = [prefix + column for column in SUMMARY_COLUMNS]
+    columns.append(f"json_extract({prefix}analogy_cards, '$[0]') AS first_analogy")
+    return ", ".join(columns)
+
+
+def _topic_key(topics: Iterable[str]) -> str:
+    """A guide's topic set as guides.topic_key: sorted, joined by \\x1f ('' for none)."""
+    return TOPIC_KEY_SEPARATOR.join(sorted(set(topics)))
+
+
+def _refresh_related(cursor: sqlite3.Cursor, changed_ids: Iterable[str]):
+    """Recompute related_guides for guides affected by changes to changed_ids.
+    
+    A guide's related list depends only on its topic set, so lists are
+    ranked once per distinct topic set ("signature") rather than per guide,
+    and candidates are grouped by (topics, urgency boost) since everything
+    in a group scores the same. That keeps the work proportional to the
+    number of signatures, not to pairs of guides. Rows are only rewritten
+    for the changed guides, guides that listed one of them before, and
+    guides whose signature now ranks one of them in its top RELATED_KEEP.
+    
+    Ties within a group go to the lowest ids, so only a group's first
+    RELATED_KEEP + 1 ids can make any list: those are all that is read,
+    skipping from group to group along idx_guides_topic_key. A whole group
+    is only read when its guides' lists are rewritten.
+    """
+    changed = set(changed_ids)
+    if not changed:
+        return
+    
+    listers = {row[0] for row in cursor.execute(
+        "SELECT guide_id FROM related_guides WHERE related_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(changed)),),
+    )}
+    # Topic keys of every guide whose list is rewritten (deleted guides have none)
+    keys = dict(cursor.execute(
+        "SELECT id, topic_key FROM guides WHERE id IN (SELECT value FROM json_each(?)) AND topic_key != ''",
+        (json.dumps(sorted(changed | listers)),),
+    ))
+    # Only a signature sharing one of these topics can rank a changed guide
+    changed_topics = set()
+    for guide_id in changed.intersection(keys):
+        changed_topics.update(keys[guide_id].split(TOPIC_KEY_SEPARATOR))
+    
+    boosts_by_topics = {}
+    for topic_key, urgency_rank, members in cursor.execute("""
+        WITH RECURSIVE grouped(topic_key, urgency_rank) AS (
+            SELECT * FROM (
+                SELECT topic_key, urgency_rank FROM guides WHERE topic_key > ''
+                ORDER BY topic_key, urgency_rank LIMIT 1
+            )
+            UNION ALL
+            SELECT (
+                SELECT topic_key FROM guides
+                WHERE (topic_key, urgency_rank) > (grouped.topic_key, grouped.urgency_rank)
+                ORDER BY topic_key, urgency_rank LIMIT 1
+            ), (
+                SELECT urgency_rank FROM guides
+                WHERE (topic_key, urgency_rank) > (grouped.topic_key, grouped.urgency_rank)
+                ORDER BY topic_key, urgency_rank LIMIT 1
+            )
+            FROM grouped WHERE grouped.topic_key IS NOT NULL
+        )
+        SELECT topic_key, urgency_rank, (
+            SELECT group_concat(id, char(31)) FROM (
+                SELECT id FROM guides g
+                WHERE g.topic_key = grouped.topic_key AND g.urgency_rank = grouped.urgency_rank
+                ORDER BY id LIMIT ?
+            )
+        )
+        FROM grouped WHERE topic_key IS NOT NULL
+    """, (RELATED_KEEP + 1,)):
+        # urgency_rank is minus the urgency boost
+        boosts_by_topics.setdefault(topic_key, []).append(
+            (-urgency_rank, sorted(members.split(TOPIC_KEY_SEPARATOR)))
+        )
+    signatures = {
+        topic_key: frozenset(topic_key.split(TOPIC_KEY_SEPARATOR)) for topic_key in boosts_by_topics
+    }
+    
+    def ranked(signature: frozenset) -> List[Tuple[str, float]]:
+        """Top RELATED_KEEP + 1 (id, score) for a topic set, best first, ties by id."""
+        by_score = {}
+        for topic_key, variants in boosts_by_topics.items():
+            shared = len(signature & signatures[topic_key])
+            if shared:
+                for boost, members in variants:
+                    by_score.setdefault(shared + RELATED_URGENCY_WEIGHT * boost, []).append(members)
+        top = []
+        for score in sorted(by_score, reverse=True):
+            for guide_id in heapq.merge(*by_score[score]):
+                top.append((guide_id, score))
+                if len(top) > RELATED_KEEP:
+                    return top
+        return top
+    
+    affected = changed | listers
+    top_by_key = {}
+    reranked_keys = []
+    for topic_key, signature in signatures.items():
+        if signature & changed_topics:
+            top = top_by_key[topic_key] = ranked(signature)
+            if any(guide_id in changed for guide_id, _ in top):
+                reranked_keys.append(topic_key)
+    for guide_id, topic_key in cursor.execute(
+        "SELECT id, topic_key FROM guides WHERE topic_key IN (SELECT value FROM json_each(?))",
+        (json.dumps(reranked_keys),),
+    ):
+        affected.add(guide_id)
+        keys[guide_id] = topic_key
+    
+    cursor.executemany(
+        "DELETE FROM related_guides WHERE guide_id = ?", [(guide_id,) for guide_id in affected]
+    )
+    rows = []
+    for guide_id in affected.intersection(keys):
+        topic_key = keys[guide_id]
+        if topic_key not in top_by_key:
+            top_by_key[topic_key] = ranked(signatures[topic_key])
+        top = [(other, score) for other, score in top_by_key[topic_key] if other != guide_id]
+        rows.extend((guide_id, other, score) for other, score in top[:RELATED_KEEP])
+    cursor.executemany(
+        "INSERT INTO related_guides (guide_id, related_id, score) VALUES (?, ?, ?)", rows
+    )
+
+
+def _rebuild_related(cursor: sqlite3.Cursor):
+    """Recompute related_guides for the whole corpus."""
+    _refresh_related(cursor, [row[0] for row in cursor.execute("SELECT id FROM guides")])
+
+
+def guide_content_hash(guide: Guide) -> str:
+    """SHA-256 of everything a guide shows, for change detection on sync.
+    
+    updated_at is left out: re-stamping a guide without editing it is not a
+    change, and a real edit should not depend on someone remembering to bump it.
+    """
+    content = {
+        "id": guide.id,
+        "title": guide.title,
+        "summary": guide.summary,
+        "markdown_body": guide.markdown_body,
+        "topics": guide.topics,
+        "age_min_weeks": guide.age_min_weeks,
+        "age_max_weeks": guide.age_max_weeks,
+        "urgency": guide.urgency,
+        "analogy_cards": guide.analogy_cards,
+        "diagrams": [asdict(diagram) for diagram in guide.diagrams],
+        "do_list": guide.do_list,
+        "dont_list": guide.dont_list,
+    }
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def flow_content_hash(flow: StepFlow) -> str:
+    """SHA-256 of a step flow's steps and checklists, for change detection on sync.
+    
+    progress is left out: completion is stored per user, not on the flow.
+    """
+    content = asdict(flow)
+    del content["progress"]
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _render_guides(cursor: sqlite3.Cursor,
+                   guides: List[Tuple[str, str, List[str], List[str]]]):
+    """Store rendered HTML for (content_hash, markdown_body, do_list, dont_list) rows.
+    
+    Hashes that already have HTML are skipped, so re-ingesting unchanged
+    content never re-renders it.
+    """
+    by_hash = {guide[0]: guide for guide in guides}
+    hashes = list(by_hash)
+    for start in range(0, len(hashes), MAX_IN_PARAMS):
+        chunk = hashes[start:start + MAX_IN_PARAMS]
+        placeholders = ", ".join("?" for _ in chunk)
+        for (content_hash,) in cursor.execute(
+            f"SELECT content_hash FROM rendered_guides WHERE content_hash IN ({placeholders})",
+            chunk,
+        ).fetchall():
+            del by_hash[content_hash]
+    cursor.executemany("""
+        INSERT INTO rendered_guides (content_hash, body_html, do_dont_html)
+        VALUES (?, ?, ?)
+    """, [
+        (content_hash, render_markdown(body), render_do_dont(do_list, dont_list))
+        for content_hash, body, do_list, dont_list in by_hash.values()
+    ])
+
+
+def _render_stored_guides(cursor: sqlite3.Cursor):
+    """Render HTML for every stored guide that has none yet."""
+    _render_guides(cursor, [
+        (content_hash, body, json.loads(do_list or "[]"), json.loads(dont_list or "[]"))
+        for content_hash, body, do_list, dont_list in cursor.execute("""
+            SELECT content_hash, markdown_body, do_list, dont_list FROM guides
+            WHERE content_hash IS NOT NULL
+        """).fetchall()
+    ])
+
+
+def _bump_revision(cursor: sqlite3.Cursor):
+    """Mark guide or flow content as changed, inside the writing transaction."""
+    cursor.execute("UPDATE content_revision SET revision = revision + 1")
+
+
+def _suggestion_terms(title: str, topics: Sequence[str], do_list: Sequence[str],
+                      body: str) -> Dict[Tuple[str, str], str]:
+    """Everything one guide adds to autocomplete: (term, kind) -> display text.
+    
+    Terms are lower-cased with whitespace collapsed, which is also how
+    suggest() normalises a prefix.
+    """
+    terms: Dict[Tuple[str, str], str] = {}
+    
+    def add(kind: str, text: str):
+        term = " ".join(text.lower().split())
+        if term:
+            terms.setdefault((term, kind), " ".join(text.split()))
+    
+    add("title", title)
+    for topic in topics:
+        add("topic", topic)
+    for item in do_list:
+        add("tip", item)
+    words = set(SUGGESTION_WORD_PATTERN.findall(f"{title}\n{body}".lower())) - SUGGESTION_STOPWORDS
+    for word in words:
+        terms[(word, "word")] = word
+    return terms
+
+
+def _count_suggestions(
+    contents: Iterable[Tuple[str, Sequence[str], Sequence[str], str]],
+) -> Dict[Tuple[Tuple[str, str], str], int]:
+    """((term, kind), display) -> how many of the (title, topics, do_list, body)
+    contents contribute it."""
+    counts: Dict[Tuple[Tuple[str, str], str], int] = {}
+    for content in contents:
+        for item in _suggestion_terms(*content).items():
+            counts[item] = counts.get(item, 0) + 1
+    return counts
+
+
+def _stored_contents(cursor: sqlite3.Cursor, where: str = "",
+                     params: Sequence = ()) -> Iterator[Tuple[str, list, list, str]]:
+    """(title, topics, do_list, body) of stored guides, for _count_suggestions."""
+    rows = cursor.execute(
+        f"SELECT title, topics, do_list, markdown_body FROM guides {where}", params
+    ).fetchall()
+    for title, topics, do_list, body in rows:
+        yield title, json.loads(topics), json.loads(do_list), body
+
+
+def _stored_suggestion_terms(cursor: sqlite3.Cursor,
+                             guide_ids: Sequence[str]) -> Dict[Tuple[str, str], int]:
+    """How many of guide_ids (as currently stored) contribute each (term, kind)."""
+    counts: Dict[Tuple[str, str], int] = {}
+    for start in range(0, len(guide_ids), MAX_IN_PARAMS):
+        chunk = guide_ids[start:start + MAX_IN_PARAMS]
+        where = f"WHERE id IN ({', '.join('?' * len(chunk))})"
+        for (key, _), count in _count_suggestions(_stored_contents(cursor, where, chunk)).items():
+            counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def _update_suggestions(cursor: sqlite3.Cursor, removed: Dict[Tuple[str, str], int],
+                        added: Dict[Tuple[Tuple[str, str], str], int]):
+    """Apply the net change in guide counts when guides are rewritten or deleted.
+    
+    removed counts the (term, kind)s of the guides as they were; added maps
+    ((term, kind), display) to the guides now contributing it. Only terms
+    whose count actually changes are touched, so re-saving a guide with an
+    edited body rewrites a handful of rows, not its whole vocabulary.
+    """
+    delta: Dict[Tuple[str, str], int] = dict(removed)
+    for key in delta:
+        delta[key] = -delta[key]
+    display: Dict[Tuple[str, str], str] = {}
+    for (key, text), count in added.items():
+        delta[key] = delta.get(key, 0) + count
+        display.setdefault(key, text)
+    
+    cursor.executemany("""
+        INSERT INTO suggestions (term, kind, display, guides) VALUES (?, ?, ?, ?)
+        ON CONFLICT (term, kind) DO UPDATE SET guides = guides + excluded.guides
+    """, [(term, kind, display[(term, kind)], count)
+          for (term, kind), count in delta.items() if count > 0])
+    shrunk = [(count, term, kind) for (term, kind), count in delta.items() if count < 0]
+    cursor.executemany(
+        "UPDATE suggestions SET guides = guides + ? WHERE term = ? AND kind = ?", shrunk
+    )
+    cursor.executemany(
+        "DELETE FROM suggestions WHERE term = ? AND kind = ? AND guides <= 0",
+        [(term, kind) for _, term, kind in shrunk],
+    )
+
+
+def _rebuild_suggestions(cursor: sqlite3.Cursor):
+    """Recount the autocomplete vocabulary from every stored guide."""
+    cursor.execute("DELETE FROM suggestions")
+    _update_suggestions(cursor, {}, _count_suggestions(_stored_contents(cursor)))
+
+
+def _prune_rendered(cursor: sqlite3.Cursor):
+    """Drop rendered HTML no guide's current content hash points at."""
+    cursor.execute("""
+        DELETE FROM rendered_guides
+        WHERE content_hash NOT IN (
+            SELECT content_hash FROM guides WHERE content_hash IS NOT NULL
+        )
+    """)
+
+
+def _as_list(value: Union[str, Sequence[str], None]) -> List[str]:
+    """Normalise an optional one-or-many filter value to a list."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _age_bucket(label: Optional[str]) -> Optional[Tuple[int, Optional[int]]]:
+    """The (min weeks, max weeks) range of an AGE_BUCKETS label."""
+    if not label:
+        return None
+    for name, low, high in AGE_BUCKETS:
+        if name == label:
+            return low, high
+    raise ValueError(f"unknown age bucket: {label!r}")
+
+
+def _age_overlap(low: str, high: str) -> str:
+    """Condition on guides aliased g: its age range overlaps [low, high] (SQL
+    expressions, in weeks), answered by an R*Tree search of guide_ages."""
+    return f"g.rowid IN (SELECT id FROM guide_ages WHERE age_min <= {high} AND age_max >= {low})"
+
+
+def _age_probe(low: str, high: str) -> str:
+    """As _age_overlap, but looking up each guide's own R*Tree entry; cheaper
+    when walking an index in order for one page and most guides qualify."""
+    return (
+        f"EXISTS (SELECT 1 FROM guide_ages a WHERE a.id = g.rowid "
+        f"AND a.age_min <= {high} AND a.age_max >= {low})"
+    )
+
+
+# "9-week-old", "9 weeks old", "3 month old kitten" ...
+KITTEN_AGE_PATTERN = re.compile(r"\b(\d{1,3})[\s-]*(weeks?|wks?|months?|mths?)[\s-]*old\b", re.IGNORECASE)
+
+
+def parse_kitten_age(text: str) -> Tuple[Optional[int], str]:
+    """Pull a kitten's age out of free text, in weeks, with the rest of the text.
+    
+    "9-week-old biting" -> (9, "biting"); months count as 52/12 weeks. Gives
+    (None, text) when the text doesn't mention an age.
+    """
+    match = KITTEN_AGE_PATTERN.search(text)
+    if not match:
+        return None, text
+    number = int(match.group(1))
+    weeks = number if match.group(2).lower().startswith("w") else round(number * 52 / 12)
+    rest = " ".join(f"{text[:match.start()]} {text[match.end():]}".split())
+    return weeks, rest
+
+
+def _fts_words(query: str) -> List[str]:
+    """The searchable words of free text, lower-cased (single characters dropped)."""
+    return [word for word in re.findall(r"\w+", query.lower()) if len(word) > 1]
+
+
+def _fts_phrase(word: str) -> str:
+    """Quote one word as an FTS5 string, so it is matched as a word, not syntax."""
+    return '"' + word.replace('"', '""') + '"'
+
+
+class ConnectionPool:
+    """Bounded pool of read-only SQLite connections plus one shared writer.
+    
+    Streamlit runs every session on its own thread, so each read borrows a
+    connection of its own instead of racing over a single cursor. Writes go
+    through the writer connection one at a time. The database is put in WAL
+    mode so readers never block on the writer (or vice versa).
+    
+    In-memory databases cannot be shared between connections, so for
+    ":memory:" every read goes through the writer under its lock.
+    
+    Given a QueryMetrics, every connection is opened instrumented, so all
+    statements run through the pool are timed.
+    """
+    
+    def __init__(self, db_path: str, size: int = 4, timeout: Optional[float] = None,
+                 metrics: Optional[QueryMetrics] = None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.metrics = metrics
+        self.shared_memory = db_path == ":memory:"
+        
+        self._writer = self._connect(db_path)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._write_lock = threading.RLock()
+        
+        self._idle = queue.LifoQueue()
+        self._all_readers = []
+        self._held = threading.local()
+        self._lock = threading.Lock()
+        
+        # PRAGMA data_version is per-connection, so one connection is kept
+        # aside to watch for commits from the writer and other processes
+        self._monitor = None if self.shared_memory else self._connect_reader()
+        self._monitor_lock = threading.Lock()
+        
+        # Acquisition metrics
+        self._acquisitions = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+    
+    @property
+    def writer_connection(self) -> sqlite3.Connection:
+        """The single connection all writes go through."""
+        return self._writer
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection exclusively."""
+        with self._write_lock:
+            yield self._writer
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read connection, waiting if the whole pool is in use.
+        
+        Re-entrant: a thread that already holds a reader gets the same one back.
+        """
+        if self.shared_memory:
+            with self.writer() as conn:
+                yield conn
+            return
+        
+        held = getattr(self._held, "conn", None)
+        if held is not None:
+            self._held.depth += 1
+            try:
+                yield held
+            finally:
+                self._held.depth -= 1
+            return
+        
+        conn = self._acquire()
+        self._held.conn = conn
+        self._held.depth = 1
+        try:
+            yield conn
+        finally:
+            self._held.conn = None
+            self._idle.put(conn)
+    
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle reader, open a new one, or wait for one to come back."""
+        started = time.perf_counter()
+        waited = False
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+            if conn is None:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"no read connection free after {self.timeout}s (pool size {self.size})"
+                    ) from None
+        wait = time.perf_counter() - started
+        
+        with self._lock:
+            self._acquisitions += 1
+            if waited:
+                self._waits += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+        return conn
+    
+    def _open_reader(self) -> Optional[sqlite3.Connection]:
+        """Open another read-only connection, or None if the pool is full."""
+        with self._lock:
+            if len(self._all_readers) >= self.size:
+                return None
+            conn = self._connect_reader()
+            self._all_readers.append(conn)
+            return conn
+    
+    def _connect_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection to the database file."""
+        uri = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+        return self._connect(uri, uri=True)
+    
+    def _connect(self, database: str, **kwargs) -> sqlite3.Connection:
+        """Open a connection usable from any thread, instrumented if there are metrics."""
+        if self.metrics is None:
+            return sqlite3.connect(database, check_same_thread=False, **kwargs)
+        conn = sqlite3.connect(database, check_same_thread=False,
+                               factory=InstrumentedConnection, **kwargs)
+        conn.metrics = self.metrics
+        return conn
+    
+    def data_version(self) -> int:
+        """A number that changes whenever any other connection commits."""
+        if self._monitor is None:
+            with self.writer() as conn:
+                return conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._monitor_lock:
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+    
+    def stats(self) -> dict:
+        """Acquisition-wait metrics for the read pool."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open_readers": len(self._all_readers),
+                "idle_readers": self._idle.qsize(),
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "total_wait_seconds": self._total_wait,
+                "max_wait_seconds": self._max_wait,
+                "mean_wait_seconds": self._total_wait / self._waits if self._waits else 0.0,
+            }
+    
+    def close(self):
+        """Close every connection in the pool."""
+        with self._lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+        if self._monitor is not None:
+            self._monitor.close()
+        self._writer.close()
+
+
+@instrument_methods(skip=("close", "content_version", "guide_cache_stats", "pool_stats",
+                          "query_stats", "search_cache_stats", "slow_queries",
+                          "prometheus_metrics"))
 class KittenGuideDB:
-    """SQLite database for offline guide content."""
+    """SQLite database for offline guide content.
+    
+    Every public method and every statement is timed into `self.metrics`
+    (see instrumentation.py). Statements slower than slow_query_ms are kept
+    for slow_queries() and, given a slow_query_log path, appended to it as
+    JSON lines with their parameters redacted.
+    
+    Search results are cached (search_cache_size entries, each kept for at
+    most search_cache_ttl seconds) until content next changes; a
+    search_cache_size of 0 turns the cache off.
+    """
     
-    def __init__(self, db_path: str = "kitten_guide.db"):
+    def __init__(self, db_path: str = "kitten_guide.db", pool_size: int = 4,
+                 pool_timeout: Optional[float] = None, guide_cache_size: int = 256,
+                 slow_query_ms: float = 100.0, slow_query_log: Optional[str] = None,
+                 search_cache_size: int = 256, search_cache_ttl: Optional[float] = 300.0):
         self.db_path = db_path
-        self.conn = None
+        self.metrics = QueryMetrics(slow_query_ms / 1000, slow_query_log)
+        self.pool = ConnectionPool(db_path, size=pool_size, timeout=pool_timeout,
+                                   metrics=self.metrics)
+        self.conn = self.pool.writer_connection
+        self._write_count = 0
+        # ((data_version, write count), revision) at the last content_version()
+        self._revision = None
+        self._guide_cache = VersionedCache(guide_cache_size)
+        self._flow_cache = VersionedCache(32)
+        self._search_cache = (TTLCache(search_cache_size, search_cache_ttl)
+                              if search_cache_size else None)
         self._init_db()
     
     def _init_db(self):
         """Initialize database schema."""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        cursor = self.conn.cursor()
+        with self.pool.writer() as conn:
+            self._create_schema(conn)
+            self._migrate(conn)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Create any missing tables and indexes."""
+        cursor = conn.cursor()
         
         # Guides table
         cursor.execute("""
@@ -51,6 +957,24 @@ class KittenGuideDB:
             )
         """)
         
+        # Full-text index over search_index (rowids kept in step with search_index)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                title,
+                tags,
+                plain_body,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            )
+        """)
+        if not fts_exists:
+            # Databases created before the FTS index existed need a backfill
+            cursor.execute("""
+                INSERT INTO search_fts (rowid, title, tags, plain_body)
+                SELECT rowid, title, tags, plain_body FROM search_index
+            """)
+        
         # Diagrams table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS diagrams (
@@ -110,17 +1034,147 @@ class KittenGuideDB:
             )
         """)
         
-        self.conn.commit()
+        conn.commit()
+    
+    def _migrate(self, conn: sqlite3.Connection):
+        """Run any MIGRATIONS newer than the file's PRAGMA user_version.
+        
+        Each migration and its version bump commit together, so a failure
+        leaves the database at the last version that fully applied.
+        """
+        cursor = conn.cursor()
+        current = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for version, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            cursor.execute("BEGIN")
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def schema_version(self) -> int:
+        """The PRAGMA user_version of the open database."""
+        with self.pool.reader() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def explain(self, sql: str, params=()) -> List[str]:
+        """EXPLAIN QUERY PLAN for a query, one detail string per plan step.
+        
+        Handy for checking a query is served by an index, e.g. that no step
+        reads "SCAN guides" where a "SEARCH ... USING INDEX" is expected.
+        """
+        with self.pool.reader() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[-1] for row in rows]
     
     def add_guide(self, guide: Guide):
         """Add a guide to the database."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self.add_guides([guide])
+    
+    def add_guides(self, guides: Iterable[Guide], batch_size: Optional[int] = None) -> int:
+        """Bulk-load guides, returning how many were written.
+        
+        Guides are streamed from any iterable and written with executemany.
+        By default the whole load is one transaction; pass batch_size to commit
+        every N guides instead, each batch with its related lists refreshed.
+        The database runs in WAL journaling and synchronous=NORMAL is used for
+        the duration of the load, so a reseed pays one fsync per commit rather
+        than one per guide. An empty load writes nothing.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        with self.pool.writer() as conn:
+            try:
+                return self._load_guides(conn, guides, batch_size)
+            finally:
+                self._write_count += 1
+    
+    def _load_guides(self, conn: sqlite3.Connection, guides: Iterable[Guide],
+                     batch_size: Optional[int]) -> int:
+        """Stream guides into the database on the writer connection."""
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA synchronous")
+        previous_synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        
+        written = set()
+        batch = {}
+        try:
+            for guide in guides:
+                # Keyed by id so a repeated guide in one batch keeps its last version
+                batch[guide.id] = guide
+                if batch_size and len(batch) >= batch_size:
+                    self._commit_guide_batch(conn, cursor, batch)
+                    written.update(batch)
+                    batch = {}
+            if batch:
+                self._commit_guide_batch(conn, cursor, batch)
+                written.update(batch)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute(f"PRAGMA synchronous = {int(previous_synchronous)}")
+        
+        return len(written)
+    
+    def _commit_guide_batch(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor,
+                            batch: Dict[str, Guide]):
+        """Write one batch and commit it together with its derived rows.
+        
+        Related lists and rendered HTML are brought up to date inside the
+        same transaction, so a batched load that fails part-way leaves every
+        committed guide fully indexed.
+        """
+        self._write_guide_batch(cursor, list(batch.values()))
+        _refresh_related(cursor, batch)
+        _prune_rendered(cursor)
+        conn.commit()
+    
+    def _write_guide_batch(self, cursor: sqlite3.Cursor, guides: List[Guide]):
+        """Write guides, their search index rows and diagrams (no commit).
+        
+        The caller refreshes related guides and prunes unused rendered HTML
+        before committing.
+        """
+        doc_ids = [(guide.id,) for guide in guides]
+        hashes = [guide_content_hash(guide) for guide in guides]
+        _bump_revision(cursor)
+        
+        # Autocomplete: swap the old versions' vocabulary for the new ones'
+        _update_suggestions(
+            cursor,
+            _stored_suggestion_terms(cursor, [guide.id for guide in guides]),
+            _count_suggestions(
+                (guide.title, guide.topics, guide.do_list, guide.markdown_body) for guide in guides
+            ),
+        )
+        
+        # Drop stale full-text and age rows while the old rowids still exist
+        cursor.executemany("""
+            DELETE FROM search_fts
+            WHERE rowid IN (SELECT rowid FROM search_index WHERE doc_id = ?)
+        """, doc_ids)
+        cursor.executemany(
+            "DELETE FROM guide_ages WHERE id IN (SELECT rowid FROM guides WHERE id = ?)", doc_ids
+        )
+        
+        cursor.executemany("""
             INSERT OR REPLACE INTO guides 
             (id, title, summary, markdown_body, topics, age_min_weeks, age_max_weeks, 
-             urgency, analogy_cards, do_list, dont_list, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+             urgency, analogy_cards, do_list, dont_list, updated_at, content_hash, urgency_rank,
+             topic_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
             guide.id,
             guide.title,
             guide.summary,
@@ -132,97 +1186,790 @@ class KittenGuideDB:
             json.dumps(guide.analogy_cards),
             json.dumps(guide.do_list),
             json.dumps(guide.dont_list),
-            guide.updated_at.isoformat()
-        ))
+            guide.updated_at.isoformat(),
+            content_hash,
+            -_urgency_boost(guide.urgency),
+            _topic_key(guide.topics),
+        ) for guide, content_hash in zip(guides, hashes)])
+        cursor.executemany(f"""
+            INSERT INTO guide_ages (id, age_min, age_max)
+            SELECT rowid, COALESCE(age_min_weeks, 0), COALESCE(age_max_weeks, {AGE_OPEN_WEEKS})
+            FROM guides WHERE id = ?
+        """, doc_ids)
+        
+        # Render HTML for any content not seen before
+        _render_guides(cursor, [
+            (content_hash, guide.markdown_body, guide.do_list, guide.dont_list)
+            for guide, content_hash in zip(guides, hashes)
+        ])
         
         # Add to search index
-        urgency_boost = 3 if guide.urgency == "Now" else (2 if guide.urgency == "Today" else 0)
-        cursor.execute("""
+        cursor.executemany("""
             INSERT OR REPLACE INTO search_index
             (doc_id, title, plain_body, tags, age_range, topic, urgency_boost)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        """, [(
             guide.id,
             guide.title,
             guide.markdown_body,
             " ".join(guide.topics),
             f"{guide.age_min_weeks or 0}-{guide.age_max_weeks or 999}",
             guide.topics[0] if guide.topics else "",
-            urgency_boost
-        ))
+            _urgency_boost(guide.urgency)
+        ) for guide in guides])
+        cursor.executemany("""
+            INSERT INTO search_fts (rowid, title, tags, plain_body)
+            SELECT rowid, title, tags, plain_body FROM search_index WHERE doc_id = ?
+        """, doc_ids)
         
-        # Add diagrams
-        for diagram in guide.diagrams:
-            cursor.execute("""
-                INSERT OR REPLACE INTO diagrams
-                (id, guide_id, asset_ref, alt, caption, hotspots)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                diagram.id,
-                guide.id,
-                diagram.asset_ref,
-                diagram.alt,
-                diagram.caption,
-                json.dumps(diagram.hotspots)
-            ))
-        
-        self.conn.commit()
-    
-    def search_guides(self, query: str, topic: Optional[str] = None, 
-                     urgency: Optional[str] = None) -> List[Guide]:
-        """Search guides with filters."""
-        cursor = self.conn.cursor()
+        # Replace topic rows
+        cursor.executemany("DELETE FROM guide_topics WHERE guide_id = ?", doc_ids)
+        cursor.executemany("""
+            INSERT OR IGNORE INTO guide_topics (guide_id, topic) VALUES (?, ?)
+        """, [(guide.id, topic) for guide in guides for topic in guide.topics])
         
-        sql = """
-            SELECT g.*, s.urgency_boost
-            FROM guides g
-            JOIN search_index s ON g.id = s.doc_id
-            WHERE (s.title LIKE ? OR s.plain_body LIKE ? OR s.tags LIKE ?)
+        # Replace diagrams (dropping any the new version no longer has)
+        cursor.executemany("DELETE FROM diagrams WHERE guide_id = ?", doc_ids)
+        cursor.executemany("""
+            INSERT OR REPLACE INTO diagrams
+            (id, guide_id, asset_ref, alt, caption, hotspots)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(
+            diagram.id,
+            guide.id,
+            diagram.asset_ref,
+            diagram.alt,
+            diagram.caption,
+            json.dumps(diagram.hotspots)
+        ) for guide in guides for diagram in guide.diagrams])
+    
+    def content_manifest(self) -> Dict[str, str]:
+        """Map of guide id to stored content hash (None if not yet hashed)."""
+        with self.pool.reader() as conn:
+            return dict(conn.execute("SELECT id, content_hash FROM guides"))
+    
+    def delete_guides(self, guide_ids: Iterable[str]) -> int:
+        """Delete guides and everything indexed from them, returning how many existed."""
+        guide_ids = list(dict.fromkeys(guide_ids))
+        if not guide_ids:
+            return 0
+        
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                deleted = self._delete_guide_rows(cursor, guide_ids)
+                _refresh_related(cursor, guide_ids)
+                _prune_rendered(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._write_count += 1
+        return deleted
+    
+    def _delete_guide_rows(self, cursor: sqlite3.Cursor, guide_ids: List[str]) -> int:
+        """Delete guides with their search, topic, diagram and bookmark rows (no commit).
+        
+        The caller refreshes related guides and prunes rendered HTML afterwards.
+        """
+        doc_ids = [(guide_id,) for guide_id in guide_ids]
+        _bump_revision(cursor)
+        _update_suggestions(cursor, _stored_suggestion_terms(cursor, list(guide_ids)), {})
+        cursor.executemany("""
+            DELETE FROM search_fts
+            WHERE rowid IN (SELECT rowid FROM search_index WHERE doc_id = ?)
+        """, doc_ids)
+        cursor.executemany("DELETE FROM search_index WHERE doc_id = ?", doc_ids)
+        cursor.executemany(
+            "DELETE FROM guide_ages WHERE id IN (SELECT rowid FROM guides WHERE id = ?)", doc_ids
+        )
+        cursor.executemany("DELETE FROM guide_topics WHERE guide_id = ?", doc_ids)
+        cursor.executemany("DELETE FROM diagrams WHERE guide_id = ?", doc_ids)
+        cursor.executemany("DELETE FROM bookmarks WHERE guide_id = ?", doc_ids)
+        cursor.executemany("DELETE FROM guides WHERE id = ?", doc_ids)
+        return cursor.rowcount
+    
+    def content_file_manifest(self, pack: str) -> Dict[str, Tuple[int, int, str, str]]:
+        """Files last loaded from a content pack: path -> (mtime_ns, size, file_hash, guide_id)."""
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT path, mtime_ns, size, file_hash, guide_id
+                FROM content_files WHERE pack = ?
+            """, (pack,)).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+    
+    def record_content_files(self, pack: str, files: Iterable[Tuple[str, str, int, int, str]],
+                             removed_paths: Iterable[str] = ()):
+        """Update a pack's file manifest.
+        
+        files are (path, guide_id, mtime_ns, size, file_hash) rows to store;
+        removed_paths are dropped. Guides themselves are not touched.
         """
-        params = [f"%{query}%", f"%{query}%", f"%{query}%"]
+        with self.pool.writer() as conn:
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO content_files
+                    (pack, path, guide_id, mtime_ns, size, file_hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(pack, *row) for row in files])
+                conn.executemany(
+                    "DELETE FROM content_files WHERE pack = ? AND path = ?",
+                    [(pack, path) for path in removed_paths],
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def search_guides(self, query: str, topic: Union[str, Sequence[str], None] = None,
+                     urgency: Optional[str] = None, age_weeks: Optional[int] = None,
+                     after: Optional[Tuple[float, str, str]] = None,
+                     limit: Optional[int] = None) -> List[SearchResult]:
+        """Search guides with filters, best matches first.
         
-        if topic:
-            sql += " AND s.topic = ?"
-            params.append(topic)
+        Relevance is BM25 over the full-text index (title weighted above tags,
+        tags above body), a bonus for the best field matched, and an urgency
+        boost so emergency content floats up. Results carry GuideSummary
+        objects; load the full Guide with get_guide when it is opened.
+        
+        topic may be one topic or several; a guide matches if it is tagged
+        with any of them. age_weeks keeps guides whose age range includes a
+        kitten of that age (see parse_kitten_age).
+        
+        Pages with a keyset cursor: results are ordered by (score DESC, title,
+        id), so pass search_cursor(last result) as `after` with a `limit` for
+        the next page, and search_count for the total.
+        
+        Results come from the search cache when the same search (after
+        normalising the query, see _search_key) ran since content last
+        changed; they are shared between callers, so treat them as read-only.
+        """
+        def load() -> List[SearchResult]:
+            conditions, params = self._search_filters(topic, urgency, age_weeks=age_weeks)
+            with self.pool.reader() as conn:
+                search = self._search_from(conn, query, conditions.values(), params)
+                if search is None:
+                    return []
+                return self._ranked_search(conn, *search, after, limit)
+        
+        key = self._search_key("guides", query, topic, urgency, age_weeks, after, limit)
+        return list(self._cached_search(key, load))
+    
+    def search_count(self, query: str, topic: Union[str, Sequence[str], None] = None,
+                     urgency: Optional[str] = None, age_weeks: Optional[int] = None) -> int:
+        """How many guides search_guides would return for these arguments in total."""
+        def load() -> int:
+            conditions, params = self._search_filters(topic, urgency, age_weeks=age_weeks)
+            with self.pool.reader() as conn:
+                search = self._search_from(conn, query, conditions.values(), params)
+                if search is None:
+                    return 0
+                from_where, params = search
+                return conn.execute(f"SELECT COUNT(*) {from_where}", params).fetchone()[0]
+        
+        return self._cached_search(self._search_key("count", query, topic, urgency, age_weeks), load)
+    
+    @staticmethod
+    def _search_key(kind: str, query: str, topic: Union[str, Sequence[str], None] = None,
+                    *rest: object) -> tuple:
+        """Search cache key: the query as the full-text terms it becomes, so
+        "Litter  Tray" and "litter tray" share an entry, and topics in sorted
+        order, plus the remaining arguments as given."""
+        topics = (topic,) if isinstance(topic, str) else tuple(sorted(set(topic or ())))
+        return (kind, tuple(_fts_words(query)), topics) + rest
+    
+    def _cached_search(self, key: tuple, load):
+        """load()'s result for key, through the search cache.
+        
+        The cache is keyed on content_version(), so any guide write (add_guide,
+        add_guides, a content sync, in this process or another) empties it.
+        Concurrent identical misses run load() once between them.
+        """
+        if self._search_cache is None:
+            return load()
+        return self._search_cache.get_or_load(key, load, self.content_version())
+    
+    def search_cache_stats(self) -> dict:
+        """Size, hit rate, miss, eviction, expiry, coalescing and invalidation
+        counters for the search cache (empty when it is turned off)."""
+        return self._search_cache.stats() if self._search_cache is not None else {}
+    
+    def suggest(self, prefix: str, k: int = 8) -> List[Suggestion]:
+        """Up to k autocomplete suggestions starting with prefix, best first.
+        
+        Suggestions are guide titles, topics, do-list tips and body words
+        (see SUGGESTION_WEIGHTS for how kinds rank), matched case-insensitively
+        from the start; a trailing space asks for phrases that continue past
+        the last whole word. The vocabulary is kept up to date as guides are
+        written, so this is one primary-key range scan.
+        """
+        term = " ".join(prefix.lower().split())
+        if not term or k < 1:
+            return []
+        if prefix[-1:].isspace():
+            term += " "
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        
+        weights = " ".join(
+            f"WHEN '{kind}' THEN {weight}" for kind, weight in SUGGESTION_WEIGHTS.items()
+        )
+        with self.pool.reader() as conn:
+            rows = conn.execute(f"""
+                SELECT display, kind, guides FROM suggestions
+                WHERE term >= ? AND term < ?
+                ORDER BY guides * CASE kind {weights} ELSE 1 END DESC, term
+                LIMIT ?
+            """, (term, upper, k * len(SUGGESTION_WEIGHTS))).fetchall()
+        
+        # A topic and a word can read the same ("Litter", "litter"); keep the better one
+        suggestions: List[Suggestion] = []
+        seen = set()
+        for display, kind, guides in rows:
+            if display.lower() not in seen:
+                seen.add(display.lower())
+                suggestions.append(Suggestion(text=display, kind=kind, guides=guides))
+        return suggestions[:k]
+    
+    def search_faceted(self, query: str, filters: Optional[Dict[str, object]] = None,
+                       after: Optional[Tuple[float, str, str]] = None,
+                       limit: Optional[int] = None) -> FacetedSearch:
+        """Search like search_guides, plus match counts per topic, urgency and age bucket.
+        
+        filters maps any of FACETS to a value: "topic" (one topic or several),
+        "urgency", and "age" (an AGE_BUCKETS label); "age_weeks" also filters,
+        as in search_guides, without a facet of its own. Each facet is counted with
+        every filter applied except its own, so its counts are what choosing
+        that value instead would return. All the counts and the total come from
+        one query over the full-text matches; the page of results from a second
+        on the same connection. A query with no searchable words but some
+        filter (say "9-week-old", once the page has taken the age out) lists
+        every guide the filters allow, most urgent first, with the facets
+        counted over that listing. Cached like search_guides, so treat the
+        returned object as read-only.
+        """
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        unknown = set(filters) - set(FACETS) - {"age_weeks"}
+        if unknown:
+            raise ValueError(f"unknown search filter(s): {', '.join(sorted(unknown))}")
+        
+        def load() -> FacetedSearch:
+            conditions, params = self._search_filters(
+                filters.get("topic"), filters.get("urgency"), _age_bucket(filters.get("age")),
+                filters.get("age_weeks"),
+            )
+            with self.pool.reader() as conn:
+                search = self._search_from(conn, query, conditions.values(), params)
+                if search is not None:
+                    from_where, params = search
+                    results = self._ranked_search(conn, from_where, params, after, limit)
+                    total, facets = self._facet_counts(conn, conditions, params)
+                elif conditions:
+                    # Nothing left to match ("9-week-old"): list what the filters allow
+                    results = self._browse_page(conn, conditions.values(), params, after, limit)
+                    total, facets = self._facet_counts(conn, conditions, params, browsing=True)
+                else:
+                    return FacetedSearch(results=[], total=0, facets={facet: {} for facet in FACETS})
+            return FacetedSearch(results=results, total=total, facets=facets)
+        
+        key = self._search_key("faceted", query, filters.get("topic"), filters.get("urgency"),
+                               filters.get("age"), filters.get("age_weeks"), after, limit)
+        return self._cached_search(key, load)
+    
+    def _browse_page(self, conn: sqlite3.Connection, conditions: Iterable[str], params: dict,
+                     after: Optional[Tuple[float, str, str]],
+                     limit: Optional[int]) -> List[SearchResult]:
+        """A page of the guides matching the filter conditions, in listing order.
+        
+        Each result is scored with its urgency boost, so the listing order
+        (urgency, title, id) is the search order and search_cursor pages it
+        along idx_guides_listing.
+        """
+        conditions = list(conditions)
+        params = dict(params)
+        if after is not None:
+            conditions.append("(g.urgency_rank, g.title, g.id) > (:after_rank, :after_title, :after_id)")
+            params.update(after_rank=-after[0], after_title=after[1], after_id=after[2])
+        sql = f"SELECT {_summary_columns('g')}, -g.urgency_rank FROM guides g"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY g.urgency_rank, g.title, g.id"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+        
+        width = len(SUMMARY_COLUMNS) + 1
+        return [
+            SearchResult(guide=self._row_to_summary(row), score=row[width], match_type="filters")
+            for row in conn.execute(sql, params).fetchall()
+        ]
+    
+    @staticmethod
+    def _facet_counts(conn: sqlite3.Connection, conditions: Dict[str, str],
+                      params: dict, browsing: bool = False) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """Total matches and per-facet counts, in one statement.
+        
+        The full-text matches (every guide when browsing) are collected once
+        in a CTE (with the columns the filter conditions read, under the same
+        alias), then each facet groups them under the other facets' filters.
+        """
+        if browsing:
+            matches = "FROM guides g"
+        else:
+            matches = """FROM search_fts
+                JOIN search_index s ON s.rowid = search_fts.rowid
+                JOIN guides g ON g.id = s.doc_id
+                WHERE search_fts MATCH :query"""
+        def where(excluding: Optional[str] = None) -> str:
+            applied = [sql for facet, sql in conditions.items() if facet != excluding]
+            return " AND ".join(applied) or "1"
+        
+        buckets = " UNION ALL ".join(
+            f"SELECT {position}, :bucket_label{position}, :bucket_low{position}, :bucket_high{position}"
+            for position in range(len(AGE_BUCKETS))
+        )
+        params = dict(params)
+        for position, (label, low, high) in enumerate(AGE_BUCKETS):
+            params.update({
+                f"bucket_label{position}": label,
+                f"bucket_low{position}": low,
+                f"bucket_high{position}": high,
+            })
+        
+        rows = conn.execute(f"""
+            WITH matched AS (
+                SELECT g.rowid AS rowid, g.id, g.urgency, g.age_min_weeks, g.age_max_weeks
+                {matches}
+            ),
+            age_buckets(position, label, low, high) AS ({buckets})
+            SELECT 'total', NULL, COUNT(*) FROM matched g WHERE {where()}
+            UNION ALL
+            SELECT 'topic', t.topic, COUNT(*)
+            FROM matched g CROSS JOIN guide_topics t ON t.guide_id = g.id
+            WHERE {where("topic")}
+            GROUP BY t.topic
+            UNION ALL
+            SELECT 'urgency', g.urgency, COUNT(*)
+            FROM matched g
+            WHERE g.urgency != '' AND {where("urgency")}
+            GROUP BY g.urgency
+            UNION ALL
+            SELECT 'age', b.label, COUNT(*)
+            FROM matched g JOIN age_buckets b
+              ON (b.high IS NULL OR COALESCE(g.age_min_weeks, 0) <= b.high)
+             AND (g.age_max_weeks IS NULL OR g.age_max_weeks >= b.low)
+            WHERE {where("age")}
+            GROUP BY b.position
+        """, params).fetchall()
+        
+        total = 0
+        counts: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        for facet, value, count in rows:
+            if facet == "total":
+                total = count
+            else:
+                counts[facet][value] = count
+        # Topics busiest first; urgency and age in their natural order
+        facets = {
+            "topic": dict(sorted(counts["topic"].items(), key=lambda item: (-item[1], item[0]))),
+            "urgency": {level: counts["urgency"][level] for level in URGENCY_LEVELS
+                        if level in counts["urgency"]},
+            "age": {label: counts["age"][label] for label, _, _ in AGE_BUCKETS
+                    if label in counts["age"]},
+        }
+        return total, facets
+    
+    @staticmethod
+    def _search_filters(topic: Union[str, Sequence[str], None] = None,
+                        urgency: Optional[str] = None,
+                        age: Optional[Tuple[int, Optional[int]]] = None,
+                        age_weeks: Optional[int] = None) -> Tuple[Dict[str, str], dict]:
+        """SQL condition per active filter, over guides aliased g, and their parameters.
+        
+        age is an inclusive (min weeks, max weeks or None) range and age_weeks
+        a single age; a guide matches if its own age range overlaps them.
+        """
+        conditions: Dict[str, str] = {}
+        params: dict = {}
+        
+        topics = _as_list(topic)
+        if topics:
+            placeholders = ", ".join(f":topic{i}" for i in range(len(topics)))
+            conditions["topic"] = (
+                f"g.id IN (SELECT guide_id FROM guide_topics WHERE topic IN ({placeholders}))"
+            )
+            params.update({f"topic{i}": value for i, value in enumerate(topics)})
         
         if urgency:
-            sql += " AND g.urgency = ?"
-            params.append(urgency)
+            conditions["urgency"] = "g.urgency = :urgency"
+            params["urgency"] = urgency
         
-        sql += " ORDER BY s.urgency_boost DESC, g.title"
+        if age:
+            low, high = age
+            conditions["age"] = _age_overlap(":age_low", ":age_high")
+            params.update(age_low=low, age_high=AGE_OPEN_WEEKS if high is None else high)
         
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
+        if age_weeks is not None:
+            conditions["age_weeks"] = _age_overlap(":age_weeks", ":age_weeks")
+            params["age_weeks"] = age_weeks
+        return conditions, params
+    
+    @staticmethod
+    def _fts_match(conn: sqlite3.Connection, query: str) -> Optional[Tuple[str, str]]:
+        """FTS5 MATCH expressions for free text, or None if it has no searchable words.
         
-        guides = []
-        for row in rows:
-            guides.append(Guide(
-                id=row[0],
-                title=row[1],
-                summary=row[2],
-                markdown_body=row[3],
-                topics=json.loads(row[4]) if row[4] else [],
-                age_min_weeks=row[5],
-                age_max_weeks=row[6],
-                urgency=row[7],
-                analogy_cards=json.loads(row[8]) if row[8] else [],
-                do_list=json.loads(row[9]) if row[9] else [],
-                dont_list=json.loads(row[10]) if row[10] else [],
-                diagrams=[],
-                updated_at=datetime.fromisoformat(row[11])
-            ))
-        
-        return guides
+        A guide must contain every word (the porter stemmer already matches
+        their other forms); the last, possibly half-typed, word may instead be
+        the start of any word or topic in the autocomplete vocabulary, so
+        "not eat" becomes "not" AND ("eat" OR "eating" OR ...). Prefixes are
+        expanded there, unstemmed, rather than with FTS5 "word"* queries, which
+        stem first: "tray"* would become trai* and match "training". The second
+        expression ORs the same terms, for telling which field a guide matched in.
+        """
+        words = _fts_words(query)
+        if not words:
+            return None
+        last = words[-1]
+        completions = [term for (term,) in conn.execute("""
+            SELECT term FROM suggestions
+            WHERE term > ? AND term < ? AND kind IN ('word', 'topic') AND instr(term, ' ') = 0
+            ORDER BY guides DESC, term
+            LIMIT ?
+        """, (last, last[:-1] + chr(ord(last[-1]) + 1), PREFIX_COMPLETIONS))]
+        last_group = " OR ".join(_fts_phrase(word) for word in dict.fromkeys([last] + completions))
+        match = " AND ".join([_fts_phrase(word) for word in dict.fromkeys(words[:-1])]
+                             + [f"({last_group})"])
+        any_term = " OR ".join(_fts_phrase(word) for word in dict.fromkeys(words + completions))
+        return match, any_term
+    
+    def _search_from(self, conn: sqlite3.Connection, query: str, conditions: Iterable[str],
+                     params: dict) -> Optional[Tuple[str, dict]]:
+        """FROM ... WHERE clause over the full-text matches with the filter
+        conditions applied, and its parameters (with "query" and "any_query"
+        added), or None if the query has no searchable terms."""
+        match = self._fts_match(conn, query)
+        if match is None:
+            return None
+        match, any_term = match
+        
+        sql = """
+            FROM search_fts
+            JOIN search_index s ON s.rowid = search_fts.rowid
+            JOIN guides g ON g.id = s.doc_id
+            WHERE search_fts MATCH :query
+        """
+        for condition in conditions:
+            sql += f" AND {condition}"
+        return sql, {**params, "query": match, "any_query": any_term}
+    
+    def _ranked_search(self, conn: sqlite3.Connection, from_where: str, params: dict,
+                       after: Optional[Tuple[float, str, str]],
+                       limit: Optional[int]) -> List[SearchResult]:
+        """Score, order and page the matches of a _search_from clause."""
+        sql = f"""
+            SELECT {_summary_columns("g")},
+                   -bm25(search_fts, :title_weight, :tags_weight, :body_weight)
+                       + s.urgency_boost * :urgency_weight AS relevance,
+                   CASE
+                       WHEN search_fts.rowid IN (
+                           SELECT rowid FROM search_fts WHERE search_fts MATCH :title_query
+                       ) THEN 'title'
+                       WHEN search_fts.rowid IN (
+                           SELECT rowid FROM search_fts WHERE search_fts MATCH :tags_query
+                       ) THEN 'tags'
+                       ELSE 'body'
+                   END AS match_type
+            {from_where}
+        """
+        params = {
+            **params,
+            "title_weight": FTS_TITLE_WEIGHT,
+            "tags_weight": FTS_TAGS_WEIGHT,
+            "body_weight": FTS_BODY_WEIGHT,
+            "urgency_weight": URGENCY_WEIGHT,
+            "title_bonus": TITLE_MATCH_BONUS,
+            "tags_bonus": TAGS_MATCH_BONUS,
+            "title_query": f"title : ({params['any_query']})",
+            "tags_query": f"tags : ({params['any_query']})",
+        }
+        
+        sql = f"""
+            SELECT * FROM (
+                SELECT ranked.*,
+                       relevance + CASE match_type
+                           WHEN 'title' THEN :title_bonus
+                           WHEN 'tags' THEN :tags_bonus
+                           ELSE 0
+                       END AS score,
+                       match_type
+                FROM ({sql}) ranked
+            )
+        """
+        if after is not None:
+            sql += """
+                WHERE score < :after_score
+                   OR (score = :after_score AND (title, id) > (:after_title, :after_id))
+            """
+            params.update(after_score=after[0], after_title=after[1], after_id=after[2])
+        sql += " ORDER BY score DESC, title, id"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+        
+        rows = conn.execute(sql, params).fetchall()
+        
+        # Row layout: summary columns, relevance, match_type, score
+        width = len(SUMMARY_COLUMNS) + 1
+        return [
+            SearchResult(
+                guide=self._row_to_summary(row),
+                score=row[width + 2],
+                match_type=row[width + 1],
+            )
+            for row in rows
+        ]
     
     def get_guide(self, guide_id: str) -> Optional[Guide]:
-        """Get a specific guide by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM guides WHERE id = ?", (guide_id,))
-        row = cursor.fetchone()
+        """Get a specific guide by ID.
+        
+        Hydrated guides are kept in a bounded LRU cache that is emptied as soon
+        as content_version() changes. Cached guides are shared between callers,
+        so treat them as read-only.
+        """
+        version = self.content_version()
+        self._guide_cache.sync(version)
+        guide = self._guide_cache.get(guide_id)
+        if guide is not None:
+            return guide
+        
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                f"SELECT {_guide_columns()} FROM guides WHERE id = ?", (guide_id,)
+            ).fetchone()
         
         if not row:
             return None
         
+        guide = self._row_to_guide(row)
+        self._guide_cache.put(guide_id, guide, version=version)
+        return guide
+    
+    def get_guide_html(self, guide_id: str) -> Optional[RenderedGuide]:
+        """Pre-rendered HTML for a guide, or None if it has not been rendered.
+        
+        Served from rendered_guides by the guide's current content hash, so
+        pages show it without any Markdown work on the request path.
+        """
+        version = self.content_version()
+        self._guide_cache.sync(version)
+        key = ("html", guide_id)
+        rendered = self._guide_cache.get(key)
+        if rendered is not None:
+            return rendered
+        
+        with self.pool.reader() as conn:
+            row = conn.execute("""
+                SELECT r.body_html, r.do_dont_html
+                FROM guides g
+                JOIN rendered_guides r ON r.content_hash = g.content_hash
+                WHERE g.id = ?
+            """, (guide_id,)).fetchone()
+        
+        if not row:
+            return None
+        
+        rendered = RenderedGuide(body_html=row[0], do_dont_html=row[1])
+        self._guide_cache.put(key, rendered, version=version)
+        return rendered
+    
+    def get_diagrams(self, guide_ids: Iterable[str]) -> Dict[str, List[Diagram]]:
+        """Load diagrams for many guides at once, keyed by guide id.
+        
+        Uses one IN (...) query per MAX_IN_PARAMS ids rather than one query
+        per guide. Guides without diagrams map to an empty list.
+        """
+        ids = list(dict.fromkeys(guide_ids))
+        diagrams = {guide_id: [] for guide_id in ids}
+        
+        with self.pool.reader() as conn:
+            for start in range(0, len(ids), MAX_IN_PARAMS):
+                chunk = ids[start:start + MAX_IN_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(f"""
+                    SELECT guide_id, id, asset_ref, alt, caption, hotspots
+                    FROM diagrams
+                    WHERE guide_id IN ({placeholders})
+                    ORDER BY guide_id, rowid
+                """, chunk).fetchall()
+                for row in rows:
+                    diagrams[row[0]].append(Diagram(
+                        id=row[1],
+                        asset_ref=row[2],
+                        alt=row[3],
+                        caption=row[4],
+                        hotspots=json.loads(row[5]) if row[5] else []
+                    ))
+        
+        return diagrams
+    
+    def attach_diagrams(self, guides: List[Guide]) -> List[Guide]:
+        """Copies of guides with `diagrams` filled in by one batched query.
+        
+        The given guides are left untouched, since they may be shared guide
+        cache entries.
+        """
+        diagrams = self.get_diagrams(guide.id for guide in guides)
+        return [replace(guide, diagrams=diagrams.get(guide.id, [])) for guide in guides]
+    
+    def content_version(self) -> int:
+        """Revision of guide and flow content; changes whenever either is written.
+        
+        Stored in the database, so content written by another process counts
+        too, while bookmark and progress writes leave it alone. The stored
+        row is only re-read when SQLite's data_version or the local write
+        counter shows a commit has happened since the last check.
+        """
+        seen = (self.pool.data_version(), self._write_count)
+        checked = self._revision
+        if checked is not None and checked[0] == seen:
+            return checked[1]
+        with self.pool.reader() as conn:
+            revision = conn.execute("SELECT revision FROM content_revision").fetchone()[0]
+        self._revision = (seen, revision)
+        return revision
+    
+    def guide_cache_stats(self) -> dict:
+        """Hit, miss, eviction and invalidation counters for the guide cache."""
+        return self._guide_cache.stats()
+    
+    def get_all_guides(self, age_weeks: Optional[int] = None,
+                       after: Optional[Tuple[int, str, str]] = None,
+                       limit: Optional[int] = None) -> List[Guide]:
+        """Get all guides (or those for a kitten age_weeks old), most urgent
+        first, then by title.
+        
+        Pages with a keyset cursor: pass listing_cursor(last guide) as `after`
+        with a `limit`; guide_count() gives the total.
+        """
+        rows = self._listing_rows(_guide_columns("g"), None, age_weeks, after, limit)
+        return [self._row_to_guide(row) for row in rows]
+    
+    def get_related(self, guide_id: str, k: int = 3) -> List[GuideSummary]:
+        """Up to k guides most related to guide_id, from the precomputed index."""
+        with self.pool.reader() as conn:
+            rows = conn.execute(f"""
+                SELECT {_summary_columns('g')}
+                FROM related_guides r
+                JOIN guides g ON g.id = r.related_id
+                WHERE r.guide_id = ?
+                ORDER BY r.score DESC, r.related_id
+                LIMIT ?
+            """, (guide_id, k)).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+    
+    def get_guide_summaries(self, topic: Optional[str] = None, age_weeks: Optional[int] = None,
+                            after: Optional[Tuple[int, str, str]] = None,
+                            limit: Optional[int] = None) -> List[GuideSummary]:
+        """Get a lightweight summary of every guide (or one topic's, and/or those
+        for a kitten age_weeks old), most urgent first, then by title.
+        
+        Pages like get_all_guides; guide_count(topic, age_weeks) gives the total.
+        """
+        rows = self._listing_rows(_summary_columns("g"), topic, age_weeks, after, limit)
+        return [self._row_to_summary(row) for row in rows]
+    
+    def _listing_rows(self, columns: str, topic: Optional[str], age_weeks: Optional[int],
+                      after: Optional[Tuple[int, str, str]], limit: Optional[int]) -> list:
+        """Run a keyset-paginated listing over idx_guides_listing.
+        
+        The cursor is (urgency_boost, title, id); urgency_rank stores minus the
+        boost so the whole order is one ascending row-value comparison, and a
+        page costs an index seek however deep it is.
+        """
+        sql = f"SELECT {columns} FROM guides g"
+        conditions, params = self._listing_filters(topic, age_weeks, walking=True)
+        if after is not None:
+            conditions.append("(g.urgency_rank, g.title, g.id) > (?, ?, ?)")
+            params.extend((-after[0], after[1], after[2]))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY g.urgency_rank, g.title, g.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self.pool.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _listing_filters(topic: Optional[str], age_weeks: Optional[int],
+                         walking: bool = False) -> Tuple[List[str], list]:
+        """Conditions on guides aliased g for a topic and kitten age, with their parameters.
+        
+        walking: the query walks idx_guides_listing for a page, so check each
+        guide's age as it comes rather than searching for every match up front.
+        Most guides suit most kitten ages, so the page fills within a few rows.
+        """
+        conditions = []
+        params = []
+        if topic:
+            # Walk the listing index and probe each guide's topics, rather than
+            # joining from guide_topics and sorting the whole topic
+            conditions.append(
+                "EXISTS (SELECT 1 FROM guide_topics t WHERE t.guide_id = g.id AND t.topic = ?)"
+            )
+            params.append(topic)
+        if age_weeks is not None:
+            conditions.append((_age_probe if walking else _age_overlap)("?", "?"))
+            params.extend((age_weeks, age_weeks))
+        return conditions, params
+    
+    def guide_count(self, topic: Optional[str] = None, age_weeks: Optional[int] = None) -> int:
+        """Number of guides in the database, or tagged with topic and/or for a
+        kitten age_weeks old."""
+        with self.pool.reader() as conn:
+            if topic and age_weeks is None:
+                return conn.execute(
+                    "SELECT COUNT(*) FROM guide_topics WHERE topic = ?", (topic,)
+                ).fetchone()[0]
+            if age_weeks is not None and not topic:
+                return conn.execute(
+                    "SELECT COUNT(*) FROM guide_ages WHERE age_min <= ? AND age_max >= ?",
+                    (age_weeks, age_weeks),
+                ).fetchone()[0]
+            conditions, params = self._listing_filters(topic, age_weeks)
+            sql = "SELECT COUNT(*) FROM guides g"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            return conn.execute(sql, params).fetchone()[0]
+    
+    def topic_counts(self) -> Dict[str, int]:
+        """Number of guides tagged with each topic, in topic order."""
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT topic, COUNT(*) FROM guide_topics
+                GROUP BY topic
+                ORDER BY topic
+            """).fetchall()
+        return dict(rows)
+    
+    @staticmethod
+    def _row_to_summary(row) -> GuideSummary:
+        """Build a GuideSummary from a _summary_columns() row."""
+        return GuideSummary(
+            id=row[0],
+            title=row[1],
+            summary=row[2],
+            urgency=row[3],
+            age_min_weeks=row[4],
+            age_max_weeks=row[5],
+            topics_json=row[6],
+            first_analogy=row[7]
+        )
+    
+    @staticmethod
+    def _row_to_guide(row) -> Guide:
+        """Hydrate a Guide from a `guides` row (columns in table order)."""
         return Guide(
             id=row[0],
             title=row[1],
@@ -239,84 +1986,312 @@ class KittenGuideDB:
             updated_at=datetime.fromisoformat(row[11])
         )
     
-    def get_all_guides(self) -> List[Guide]:
-        """Get all guides."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM guides ORDER BY title")
-        rows = cursor.fetchall()
+    def add_bookmark(self, guide_id: str, user_id: str = DEFAULT_USER_ID):
+        """Bookmark a guide for a user."""
+        with self.pool.writer() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO bookmarks (user_id, guide_id, created_at)
+                VALUES (?, ?, ?)
+            """, (user_id, guide_id, datetime.now().isoformat()))
+            conn.commit()
+    
+    def remove_bookmark(self, guide_id: str, user_id: str = DEFAULT_USER_ID):
+        """Remove a user's bookmark."""
+        with self.pool.writer() as conn:
+            conn.execute(
+                "DELETE FROM bookmarks WHERE user_id = ? AND guide_id = ?", (user_id, guide_id)
+            )
+            conn.commit()
+    
+    def get_bookmarked_guides(self, user_id: str = DEFAULT_USER_ID,
+                              after: Optional[Tuple[str, str]] = None,
+                              limit: Optional[int] = None) -> List[Guide]:
+        """Get a user's bookmarked guides, newest first.
         
-        guides = []
+        Pages with a keyset cursor: pass the (bookmarked_at, guide_id) of the
+        last bookmark already shown as `after` (see get_bookmarked_summaries).
+        """
+        rows = self._bookmark_rows(_guide_columns("g"), user_id, after, limit)
+        return [self._row_to_guide(row) for row in rows]
+    
+    def get_bookmarked_summaries(self, user_id: str = DEFAULT_USER_ID,
+                                 after: Optional[Tuple[str, str]] = None,
+                                 limit: Optional[int] = None) -> List[GuideSummary]:
+        """Get lightweight summaries of a user's bookmarked guides, newest first.
+        
+        Each summary has `bookmarked_at` set, so the next page starts
+        `after=(last.bookmarked_at, last.id)`.
+        """
+        rows = self._bookmark_rows(
+            f"{_summary_columns('g')}, b.created_at", user_id, after, limit
+        )
+        summaries = []
         for row in rows:
-            guides.append(Guide(
-                id=row[0],
-                title=row[1],
-                summary=row[2],
-                markdown_body=row[3],
-                topics=json.loads(row[4]) if row[4] else [],
-                age_min_weeks=row[5],
-                age_max_weeks=row[6],
-                urgency=row[7],
-                analogy_cards=json.loads(row[8]) if row[8] else [],
-                do_list=json.loads(row[9]) if row[9] else [],
-                dont_list=json.loads(row[10]) if row[10] else [],
-                diagrams=[],
-                updated_at=datetime.fromisoformat(row[11])
-            ))
-        
-        return guides
-    
-    def add_bookmark(self, guide_id: str):
-        """Bookmark a guide."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO bookmarks (guide_id, created_at)
-            VALUES (?, ?)
-        """, (guide_id, datetime.now().isoformat()))
-        self.conn.commit()
-    
-    def remove_bookmark(self, guide_id: str):
-        """Remove a bookmark."""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM bookmarks WHERE guide_id = ?", (guide_id,))
-        self.conn.commit()
-    
-    def get_bookmarked_guides(self) -> List[Guide]:
-        """Get all bookmarked guides."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT g.* FROM guides g
-            JOIN bookmarks b ON g.id = b.guide_id
-            ORDER BY b.created_at DESC
-        """)
-        rows = cursor.fetchall()
+            summary = self._row_to_summary(row)
+            summary.bookmarked_at = row[-1]
+            summaries.append(summary)
+        return summaries
+    
+    def _bookmark_rows(self, columns: str, user_id: str,
+                       after: Optional[Tuple[str, str]], limit: Optional[int]) -> list:
+        """Run a keyset-paginated bookmark listing over idx_bookmarks_user_created."""
+        sql = f"""
+            SELECT {columns} FROM bookmarks b
+            JOIN guides g ON g.id = b.guide_id
+            WHERE b.user_id = ?
+        """
+        params = [user_id]
+        if after is not None:
+            sql += " AND (b.created_at, b.guide_id) < (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY b.created_at DESC, b.guide_id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
         
-        guides = []
+        with self.pool.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+    
+    def bookmark_count(self, user_id: str = DEFAULT_USER_ID) -> int:
+        """Number of guides a user has bookmarked."""
+        with self.pool.reader() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM bookmarks WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+    
+    def is_bookmarked(self, guide_id: str, user_id: str = DEFAULT_USER_ID) -> bool:
+        """Check if a user has bookmarked a guide."""
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM bookmarks WHERE user_id = ? AND guide_id = ?", (user_id, guide_id)
+            ).fetchone()
+        return row is not None
+    
+    def are_bookmarked(self, user_id: str, guide_ids: Iterable[str]) -> Set[str]:
+        """Which of guide_ids a user has bookmarked, in one query per MAX_IN_PARAMS ids."""
+        ids = list(dict.fromkeys(guide_ids))
+        saved = set()
+        with self.pool.reader() as conn:
+            for start in range(0, len(ids), MAX_IN_PARAMS):
+                chunk = ids[start:start + MAX_IN_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(f"""
+                    SELECT guide_id FROM bookmarks
+                    WHERE user_id = ? AND guide_id IN ({placeholders})
+                """, [user_id, *chunk]).fetchall()
+                saved.update(row[0] for row in rows)
+        return saved
+    
+    def add_step_flow(self, flow: StepFlow):
+        """Add (or replace) a step flow with its steps and checklist items."""
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                _bump_revision(cursor)
+                # Clear out the previous version's steps and checklist items
+                cursor.execute("""
+                    DELETE FROM checklist_items
+                    WHERE step_id IN (SELECT id FROM steps WHERE flow_id = ?)
+                """, (flow.id,))
+                cursor.execute("DELETE FROM steps WHERE flow_id = ?", (flow.id,))
+                
+                cursor.execute("""
+                    INSERT OR REPLACE INTO step_flows (id, title, description, content_hash)
+                    VALUES (?, ?, ?, ?)
+                """, (flow.id, flow.title, flow.description, flow_content_hash(flow)))
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO steps
+                    (id, flow_id, title, instructions, examples, time_estimate,
+                     red_flags, analogy, step_order, guide_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(
+                    step.id,
+                    flow.id,
+                    step.title,
+                    json.dumps(step.instructions),
+                    json.dumps(step.examples),
+                    step.time_estimate,
+                    json.dumps(step.red_flags),
+                    step.analogy,
+                    order,
+                    step.guide_id
+                ) for order, step in enumerate(flow.steps)])
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO checklist_items (id, step_id, text, item_order)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (item.id, step.id, item.text, order)
+                    for step in flow.steps
+                    for order, item in enumerate(step.checklist_items)
+                ])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._write_count += 1
+    
+    def flow_manifest(self) -> Dict[str, Optional[str]]:
+        """Map of step flow id to stored content hash (None if not yet hashed)."""
+        with self.pool.reader() as conn:
+            return dict(conn.execute("SELECT id, content_hash FROM step_flows"))
+    
+    def delete_step_flows(self, flow_ids: Iterable[str]) -> int:
+        """Delete step flows with their steps, checklist items and everyone's
+        progress through them, returning how many existed."""
+        ids = [(flow_id,) for flow_id in dict.fromkeys(flow_ids)]
+        if not ids:
+            return 0
+        
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                _bump_revision(cursor)
+                cursor.executemany("""
+                    DELETE FROM checklist_items
+                    WHERE step_id IN (SELECT id FROM steps WHERE flow_id = ?)
+                """, ids)
+                cursor.executemany("DELETE FROM steps WHERE flow_id = ?", ids)
+                cursor.executemany("DELETE FROM step_progress WHERE flow_id = ?", ids)
+                cursor.executemany("DELETE FROM step_flows WHERE id = ?", ids)
+                deleted = cursor.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._write_count += 1
+        return deleted
+    
+    def get_step_flow(self, flow_id: str) -> Optional[StepFlow]:
+        """Get a step flow with all its steps and checklist items.
+        
+        Loaded with one joined query and cached until content_version()
+        changes. The flow is shared between users, so per-user progress
+        lives in get_step_progress rather than on the StepFlow.
+        """
+        version = self.content_version()
+        self._flow_cache.sync(version)
+        flow = self._flow_cache.get(flow_id)
+        if flow is not None:
+            return flow
+        
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT f.id, f.title, f.description,
+                       s.id, s.title, s.instructions, s.examples, s.time_estimate,
+                       s.red_flags, s.analogy, s.guide_id,
+                       c.id, c.text
+                FROM step_flows f
+                LEFT JOIN steps s ON s.flow_id = f.id
+                LEFT JOIN checklist_items c ON c.step_id = s.id
+                WHERE f.id = ?
+                ORDER BY s.step_order, c.item_order
+            """, (flow_id,)).fetchall()
+        
+        if not rows:
+            return None
+        
+        flow = StepFlow(id=rows[0][0], title=rows[0][1], description=rows[0][2], steps=[])
+        steps = {}
         for row in rows:
-            guides.append(Guide(
-                id=row[0],
-                title=row[1],
-                summary=row[2],
-                markdown_body=row[3],
-                topics=json.loads(row[4]) if row[4] else [],
-                age_min_weeks=row[5],
-                age_max_weeks=row[6],
-                urgency=row[7],
-                analogy_cards=json.loads(row[8]) if row[8] else [],
-                do_list=json.loads(row[9]) if row[9] else [],
-                dont_list=json.loads(row[10]) if row[10] else [],
-                diagrams=[],
-                updated_at=datetime.fromisoformat(row[11])
-            ))
-        
-        return guides
-    
-    def is_bookmarked(self, guide_id: str) -> bool:
-        """Check if a guide is bookmarked."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT 1 FROM bookmarks WHERE guide_id = ?", (guide_id,))
-        return cursor.fetchone() is not None
+            step_id = row[3]
+            if step_id is None:
+                continue
+            step = steps.get(step_id)
+            if step is None:
+                step = Step(
+                    id=step_id,
+                    title=row[4],
+                    instructions=json.loads(row[5]) if row[5] else [],
+                    checklist_items=[],
+                    examples=json.loads(row[6]) if row[6] else [],
+                    diagrams=[],
+                    time_estimate=row[7],
+                    red_flags=json.loads(row[8]) if row[8] else [],
+                    analogy=row[9],
+                    guide_id=row[10]
+                )
+                steps[step_id] = step
+                flow.steps.append(step)
+            if row[11] is not None:
+                step.checklist_items.append(ChecklistItem(id=row[11], text=row[12]))
+        
+        self._flow_cache.put(flow_id, flow, version=version)
+        return flow
+    
+    def get_step_progress(self, user_id: str, flow_id: str) -> Set[str]:
+        """Ids of the steps a user has completed in a flow."""
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT step_id FROM step_progress WHERE user_id = ? AND flow_id = ?
+            """, (user_id, flow_id)).fetchall()
+        return {row[0] for row in rows}
+    
+    def set_step_done(self, user_id: str, flow_id: str, step_id: str, done: bool = True):
+        """Mark one step done (or not done) for a user - a single-row write."""
+        with self.pool.writer() as conn:
+            if done:
+                conn.execute("""
+                    INSERT OR REPLACE INTO step_progress (user_id, flow_id, step_id, completed_at)
+                    VALUES (?, ?, ?, ?)
+                """, (user_id, flow_id, step_id, datetime.now().isoformat()))
+            else:
+                conn.execute("""
+                    DELETE FROM step_progress WHERE user_id = ? AND flow_id = ? AND step_id = ?
+                """, (user_id, flow_id, step_id))
+            conn.commit()
+    
+    def pool_stats(self) -> dict:
+        """Read-pool acquisition and wait metrics."""
+        return self.pool.stats()
+    
+    def query_stats(self) -> dict:
+        """Estimated p50/p95/p99 latency per method and per statement, with
+        rows and bytes read, since the database was opened."""
+        return self.metrics.snapshot()
+    
+    def slow_queries(self) -> List[dict]:
+        """The most recent statements over the slow-query threshold."""
+        return self.metrics.slow_queries()
+    
+    def prometheus_metrics(self) -> str:
+        """Query metrics plus pool, guide-cache and search-cache state in Prometheus text format."""
+        pool = self.pool.stats()
+        cache = self._guide_cache.stats()
+        search_cache = self.search_cache_stats()
+        search_gauges = [
+            ("search_cache_size", "gauge", "Entries in the search result cache.", search_cache["size"]),
+            ("search_cache_hit_ratio", "gauge", "Share of searches answered from the cache.",
+             search_cache["hit_rate"]),
+            ("search_cache_hits_total", "counter", "Search cache hits.", search_cache["hits"]),
+            ("search_cache_misses_total", "counter", "Searches run against the database.",
+             search_cache["misses"]),
+            ("search_cache_coalesced_total", "counter",
+             "Searches that waited for an identical one already running.", search_cache["coalesced"]),
+            ("search_cache_evictions_total", "counter",
+             "Search results evicted to make room.", search_cache["evictions"]),
+            ("search_cache_expirations_total", "counter",
+             "Search results dropped after their time to live.", search_cache["expirations"]),
+            ("search_cache_invalidations_total", "counter",
+             "Times the search cache was emptied by a write.", search_cache["invalidations"]),
+        ] if search_cache else []
+        return self.metrics.prometheus_text([
+            ("pool_size", "gauge", "Read connections the pool may open.", pool["size"]),
+            ("pool_open_readers", "gauge", "Read connections currently open.", pool["open_readers"]),
+            ("pool_acquisitions_total", "counter", "Read connections handed out.",
+             pool["acquisitions"]),
+            ("pool_waits_total", "counter", "Acquisitions that had to wait for a free connection.",
+             pool["waits"]),
+            ("pool_wait_seconds_total", "counter", "Time spent waiting for a read connection.",
+             pool["total_wait_seconds"]),
+            ("guide_cache_size", "gauge", "Entries in the guide cache.", cache["size"]),
+            ("guide_cache_hits_total", "counter", "Guide cache hits.", cache["hits"]),
+            ("guide_cache_misses_total", "counter", "Guide cache misses.", cache["misses"]),
+            ("guide_cache_invalidations_total", "counter",
+             "Times the guide cache was emptied by a write.", cache["invalidations"]),
+        ] + search_gauges)
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close all database connections."""
+        self.pool.close()
@@ -0,0 +1,140 @@
+"""Process-wide data-access service shared by every page.
+
+Streamlit executes each page as its own script, so a `get_db()` defined in
+every page file would give each page its own cached KittenGuideDB (and its
+own connections and schema setup). Pages import `get_db` from here instead,
+so one process owns one store and one connection pool.
+
+Startup is tuned for cold containers: content_loader (and the YAML parser
+behind it) is only imported when content actually has to be synced, and
+KITTEN_GUIDE_STARTUP=lazy serves an already-populated database straight away
+while the content pack is synced on a background thread.
+"""
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from database import (  # noqa: F401 (cursors and age parsing re-exported for pages)
+    DEFAULT_USER_ID, KittenGuideDB, listing_cursor, parse_kitten_age, search_cursor,
+)
+from instrumentation import MetricsExporter, parse_address
+from models import OPS_MANUAL_FLOW_ID, GuideSummary
+
+DB_PATH = os.environ.get("KITTEN_GUIDE_DB", "kitten_guide.db")
+POOL_SIZE = int(os.environ.get("KITTEN_GUIDE_DB_POOL_SIZE", "4"))
+# Directory of Markdown guides to serve; the bundled content/guides if unset
+CONTENT_DIR = os.environ.get("KITTEN_GUIDE_CONTENT_DIR")
+# Directory of YAML step flows to serve; the bundled content/flows if unset
+FLOWS_DIR = os.environ.get("KITTEN_GUIDE_FLOWS_DIR")
+# "sync" checks content before the first page renders; "lazy" does it in the
+# background whenever the database already has guides and flows to serve
+STARTUP_MODE = os.environ.get("KITTEN_GUIDE_STARTUP", "sync")
+# Statements slower than this are logged (in memory, and to the file if set)
+SLOW_QUERY_MS = float(os.environ.get("KITTEN_GUIDE_SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.environ.get("KITTEN_GUIDE_SLOW_QUERY_LOG")
+# Search result cache shared by every session (0 turns it off); entries also
+# go whenever content changes
+SEARCH_CACHE_SIZE = int(os.environ.get("KITTEN_GUIDE_SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL = float(os.environ.get("KITTEN_GUIDE_SEARCH_CACHE_TTL", "300"))
+# Prometheus text export: a file rewritten every 15s and/or an HTTP
+# /metrics endpoint ("9464" for localhost, "0.0.0.0:9464" for all interfaces)
+METRICS_FILE = os.environ.get("KITTEN_GUIDE_METRICS_FILE")
+METRICS_ADDR = os.environ.get("KITTEN_GUIDE_METRICS_ADDR")
+# Shared deployments give each visitor their own bookmarks and progress; the
+# default is the offline single-user app, where everything belongs to one user
+PER_VISITOR = os.environ.get("KITTEN_GUIDE_PER_VISITOR", "").lower() in ("1", "true", "yes")
+
+
+def sync_content(db: KittenGuideDB):
+    """Sync the content pack and the step flows; only changed content is rewritten."""
+    from content_loader import load_content_pack, load_step_flows
+    
+    load_content_pack(db, CONTENT_DIR)
+    load_step_flows(db, FLOWS_DIR)
+
+
+@st.cache_resource
+def get_db() -> KittenGuideDB:
+    """Return the shared database, creating it and syncing content on first use.
+    
+    The content pack sync only opens files whose mtime or size changed since
+    the last run, so an up-to-date database costs a directory scan here. In
+    lazy startup mode even that moves off the first render.
+    """
+    db = KittenGuideDB(DB_PATH, pool_size=POOL_SIZE,
+                       slow_query_ms=SLOW_QUERY_MS, slow_query_log=SLOW_QUERY_LOG,
+                       search_cache_size=SEARCH_CACHE_SIZE, search_cache_ttl=SEARCH_CACHE_TTL)
+    if METRICS_FILE or METRICS_ADDR:
+        MetricsExporter(db.prometheus_metrics, path=METRICS_FILE,
+                        address=parse_address(METRICS_ADDR) if METRICS_ADDR else None).start()
+    populated = db.guide_count() > 0 and db.get_step_flow(OPS_MANUAL_FLOW_ID) is not None
+    if STARTUP_MODE == "lazy" and populated:
+        threading.Thread(target=sync_content, args=(db,), name="content-sync", daemon=True).start()
+    else:
+        sync_content(db)
+    return db
+
+
+# Corpus-wide reads, shared by every session through st.cache_data. Each is
+# keyed on the database's content version, so a content sync or edit (from
+# this process or another) moves every page onto fresh data on its next
+# rerun, while bookmark and progress writes don't invalidate anything. Old
+# versions age out of the bounded cache.
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _guide_summaries(version: int, topic: Optional[str], age_weeks: Optional[int],
+                     after: Optional[tuple], limit: Optional[int]) -> List[GuideSummary]:
+    return get_db().get_guide_summaries(topic=topic, age_weeks=age_weeks, after=after, limit=limit)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _topic_counts(version: int) -> Dict[str, int]:
+    return get_db().topic_counts()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _guide_count(version: int, topic: Optional[str], age_weeks: Optional[int]) -> int:
+    return get_db().guide_count(topic, age_weeks)
+
+
+def guide_summaries(topic: Optional[str] = None, age_weeks: Optional[int] = None,
+                    after: Optional[Tuple[int, str, str]] = None,
+                    limit: Optional[int] = None) -> List[GuideSummary]:
+    """Guide summaries (optionally one topic's, or for a kitten age_weeks old) in
+    listing order, cached across sessions; page with `after=listing_cursor(last)`
+    and `limit`."""
+    return _guide_summaries(get_db().content_version(), topic, age_weeks, after, limit)
+
+
+def topic_counts() -> Dict[str, int]:
+    """Guides per topic, cached across sessions."""
+    return _topic_counts(get_db().content_version())
+
+
+def guide_count(topic: Optional[str] = None, age_weeks: Optional[int] = None) -> int:
+    """Number of guides (optionally tagged with topic, or for a kitten age_weeks
+    old), cached across sessions."""
+    return _guide_count(get_db().content_version(), topic, age_weeks)
+
+
+def get_user_id() -> str:
+    """Return a stable id for the current visitor.
+    
+    Single-user installs (the default) keep every bookmark and all progress
+    under DEFAULT_USER_ID, so they survive restarts and new browser sessions,
+    as do bookmarks saved before bookmarks had owners. With
+    KITTEN_GUIDE_PER_VISITOR set there are still no accounts, so each visitor
+    gets a random id kept in the session and the `uid` query parameter - a
+    refresh or a bookmarked link keeps the same progress. A `uid` in the link
+    is honoured either way.
+    """
+    user_id = st.session_state.get("user_id") or st.query_params.get("uid")
+    if not user_id:
+        user_id = uuid.uuid4().hex if PER_VISITOR else DEFAULT_USER_ID
+    st.session_state["user_id"] = user_id
+    if user_id != DEFAULT_USER_ID and st.query_params.get("uid") != user_id:
+        st.query_params["uid"] = user_id
+    return user_id
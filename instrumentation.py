@@ -0,0 +1,517 @@
+"""Query timing for the database layer: latency histograms, a slow-query log
+and a Prometheus text export.
+
+KittenGuideDB opens its connections with InstrumentedConnection, so every
+statement (including raw execute calls) is timed from execute to its last
+fetch, with the rows and bytes it returned. Public KittenGuideDB methods are
+wrapped by instrument_methods, so a statement is attributed to the method
+that issued it and each method gets its own latency histogram. Everything is
+collected in one QueryMetrics per database.
+"""
+import functools
+import http.server
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds in seconds, as Prometheus expects them
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "kitten_guide_db"
+
+_clock = time.perf_counter
+
+# Label for statements run outside any KittenGuideDB method (set-up, or a
+# caller using db.conn directly)
+NO_METHOD = "raw"
+
+
+class Histogram:
+    """Bucketed latency distribution with a running sum, like a Prometheus histogram."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by interpolating within its bucket,
+        as PromQL's histogram_quantile does."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                if index == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[index] - lower) * (rank - seen) / count
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50) * 1000, 4),
+            "p95_ms": round(self.quantile(0.95) * 1000, 4),
+            "p99_ms": round(self.quantile(0.99) * 1000, 4),
+        }
+
+
+def redact(params) -> object:
+    """Parameters safe to log: numbers and NULLs as they are, text and blobs
+    as their length only (search text and user ids stay out of the log)."""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {name: _redact_value(value) for name, value in params.items()}
+    return [_redact_value(value) for value in params]
+
+
+def _redact_value(value) -> object:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, memoryview)):
+        return f"<bytes:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_RUN = re.compile(r"\?(?:\s*,\s*\?){3,}")
+
+
+def normalise_sql(sql: str) -> str:
+    """SQL on one line, with long IN (?, ?, ...) lists folded."""
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PLACEHOLDER_RUN.sub(lambda match: f"?, ... x{match.group().count('?')}", sql)
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_kind(sql: str) -> str:
+    """SELECT, INSERT, DELETE, PRAGMA, ... - the first keyword of a statement."""
+    head = sql.lstrip()[:16].split(None, 1)
+    return head[0].upper() if head else ""
+
+
+def _row_bytes(row) -> int:
+    """Approximate size of a fetched row: characters of text, bytes of blobs,
+    eight per number."""
+    size = 0
+    for value in row:
+        if value.__class__ is str or value.__class__ is bytes:
+            size += len(value)
+        elif value is not None:
+            size += 8
+    return size
+
+
+class QueryMetrics:
+    """Per-method and per-statement latency, rows and bytes, plus the slow-query log.
+
+    Statements slower than slow_query_seconds (execute through last fetch)
+    are kept in memory and, if slow_query_log is a path, appended to it as
+    JSON lines with their SQL and redacted parameters.
+    """
+
+    def __init__(self, slow_query_seconds: float = 0.1, slow_query_log: Optional[str] = None,
+                 keep_slow: int = 100):
+        self.slow_query_seconds = slow_query_seconds
+        self.slow_query_log = slow_query_log
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._local = threading.local()
+        self._methods: Dict[str, Histogram] = {}
+        self._method_errors: Dict[str, int] = {}
+        # (method, statement kind) -> histogram / rows / bytes
+        self._queries: Dict[Tuple[str, str], Histogram] = {}
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._bytes: Dict[Tuple[str, str], int] = {}
+        self._slow_counts: Dict[str, int] = {}
+        self._slow = deque(maxlen=keep_slow)
+
+    @property
+    def current_method(self) -> str:
+        """The outermost instrumented method running on this thread."""
+        return getattr(self._local, "method", None) or NO_METHOD
+
+    def record_method(self, method: str, seconds: float, failed: bool = False):
+        with self._lock:
+            histogram = self._methods.get(method)
+            if histogram is None:
+                histogram = self._methods[method] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self._method_errors[method] = self._method_errors.get(method, 0) + 1
+
+    def record_query(self, sql: str, params, seconds: float, rows: int = 0, nbytes: int = 0,
+                     method: Optional[str] = None):
+        method = method or self.current_method
+        key = (method, statement_kind(sql))
+        with self._lock:
+            histogram = self._queries.get(key)
+            if histogram is None:
+                histogram = self._queries[key] = Histogram()
+                self._rows[key] = 0
+                self._bytes[key] = 0
+            histogram.observe(seconds)
+            self._rows[key] += rows
+            self._bytes[key] += nbytes
+            slow = seconds >= self.slow_query_seconds
+            if slow:
+                self._slow_counts[method] = self._slow_counts.get(method, 0) + 1
+        if slow:
+            self._log_slow(method, sql, params, seconds, rows, nbytes)
+
+    def _log_slow(self, method: str, sql: str, params, seconds: float, rows: int, nbytes: int):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "method": method,
+            "ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "bytes": nbytes,
+            "sql": normalise_sql(sql),
+            "params": params if isinstance(params, str) else redact(params),
+        }
+        self._slow.append(entry)
+        if self.slow_query_log:
+            line = json.dumps(entry) + "\n"
+            with self._log_lock:
+                with open(self.slow_query_log, "a", encoding="utf-8") as log:
+                    log.write(line)
+
+    def slow_queries(self) -> List[dict]:
+        """The most recent slow statements, oldest first."""
+        return list(self._slow)
+
+    def snapshot(self) -> dict:
+        """Latency estimates (p50/p95/p99), rows and bytes so far, as plain dicts."""
+        with self._lock:
+            methods = {
+                name: dict(histogram.summary(), errors=self._method_errors.get(name, 0))
+                for name, histogram in sorted(self._methods.items())
+            }
+            queries = {
+                f"{method} {kind}": dict(histogram.summary(), rows=self._rows[(method, kind)],
+                                         bytes=self._bytes[(method, kind)])
+                for (method, kind), histogram in sorted(self._queries.items())
+            }
+            slow = dict(self._slow_counts)
+        return {"methods": methods, "queries": queries, "slow_queries": slow}
+
+    def prometheus_text(self, extra: Sequence[Tuple[str, str, str, float]] = ()) -> str:
+        """Everything collected so far in the Prometheus text exposition format.
+
+        extra are more (name, "gauge" or "counter", help, value) samples to
+        include, e.g. pool and cache state; names get the kitten_guide_db_ prefix.
+        """
+        lines: List[str] = []
+        with self._lock:
+            _histogram_lines(lines, f"{METRIC_PREFIX}_method_seconds",
+                             "Latency of KittenGuideDB method calls.",
+                             {(("method", name),): histogram for name, histogram in self._methods.items()})
+            _counter_lines(lines, f"{METRIC_PREFIX}_method_errors_total",
+                           "KittenGuideDB method calls that raised.",
+                           {(("method", name),): count for name, count in self._method_errors.items()})
+            query_labels = {key: (("method", key[0]), ("statement", key[1])) for key in self._queries}
+            _histogram_lines(lines, f"{METRIC_PREFIX}_query_seconds",
+                             "Latency of SQL statements, execute through last fetch.",
+                             {query_labels[key]: histogram for key, histogram in self._queries.items()})
+            _counter_lines(lines, f"{METRIC_PREFIX}_query_rows_total",
+                           "Rows returned or changed by SQL statements.",
+                           {query_labels[key]: rows for key, rows in self._rows.items()})
+            _counter_lines(lines, f"{METRIC_PREFIX}_query_bytes_total",
+                           "Approximate bytes hydrated from SQL result rows.",
+                           {query_labels[key]: nbytes for key, nbytes in self._bytes.items()})
+            _counter_lines(lines, f"{METRIC_PREFIX}_slow_queries_total",
+                           f"SQL statements slower than {self.slow_query_seconds}s.",
+                           {(("method", name),): count for name, count in self._slow_counts.items()})
+        for name, kind, help_text, value in extra:
+            name = f"{METRIC_PREFIX}_{name}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _label_text(labels: Iterable[Tuple[str, str]], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _histogram_lines(lines: List[str], name: str, help_text: str, series: Dict[tuple, Histogram]):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram.counts):
+            cumulative += count
+            bucket = 'le="%s"' % _number(bound)
+            lines.append(f"{name}_bucket{_label_text(labels, bucket)} {cumulative}")
+        lines.append(f"{name}_sum{_label_text(labels)} {_number(histogram.total)}")
+        lines.append(f"{name}_count{_label_text(labels)} {histogram.count}")
+
+
+def _counter_lines(lines: List[str], name: str, help_text: str, series: Dict[tuple, int]):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for labels, value in sorted(series.items()):
+        lines.append(f"{name}{_label_text(labels)} {value}")
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's time, rows and bytes to QueryMetrics.
+
+    A SELECT is timed across execute and every fetch and reported once its
+    rows run out, or when the cursor is reused, closed or dropped.
+    """
+
+    _pending = None  # [sql, params, seconds, rows, bytes, method] of an unfinished SELECT
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = _clock()
+        super().execute(sql, parameters)
+        elapsed = _clock() - start
+        if self.description is None:
+            self.connection.metrics.record_query(sql, parameters, elapsed, max(self.rowcount, 0))
+        else:
+            self._pending = [sql, parameters, elapsed, 0, 0, self.connection.metrics.current_method]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = _clock()
+        super().executemany(sql, seq_of_parameters)
+        self.connection.metrics.record_query(
+            sql, "<executemany>", _clock() - start, max(self.rowcount, 0)
+        )
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        start = _clock()
+        super().executescript(sql_script)
+        self.connection.metrics.record_query(sql_script, "<script>", _clock() - start)
+        return self
+
+    def fetchone(self):
+        start = _clock()
+        row = super().fetchone()
+        pending = self._pending
+        if pending is not None:
+            pending[2] += _clock() - start
+            if row is None:
+                self._finish()
+            else:
+                pending[3] += 1
+                pending[4] += _row_bytes(row)
+        return row
+
+    def fetchmany(self, size=None):
+        start = _clock()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add_rows(rows, _clock() - start)
+        if len(rows) < (self.arraysize if size is None else size):
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = _clock()
+        rows = super().fetchall()
+        self._add_rows(rows, _clock() - start)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = _clock()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            if self._pending is not None:
+                self._pending[2] += _clock() - start
+            self._finish()
+            raise
+        pending = self._pending
+        if pending is not None:
+            pending[2] += _clock() - start
+            pending[3] += 1
+            pending[4] += _row_bytes(row)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _add_rows(self, rows, seconds: float):
+        pending = self._pending
+        if pending is not None:
+            pending[2] += seconds
+            pending[3] += len(rows)
+            pending[4] += sum(map(_row_bytes, rows))
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, params, seconds, rows, nbytes, method = pending
+            self.connection.metrics.record_query(sql, params, seconds, rows, nbytes, method)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind execute(), are instrumented.
+
+    Open with sqlite3.connect(..., factory=InstrumentedConnection) and set
+    `metrics` before use.
+    """
+
+    metrics: QueryMetrics = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def instrument_methods(*, skip: Iterable[str] = ()) -> Callable[[type], type]:
+    """Class decorator timing every public method against `self.metrics`.
+
+    Statements run inside a method are labelled with the outermost
+    instrumented method on the thread, so search_guides' SQL is reported
+    as search_guides even when it goes through helpers.
+    """
+    skip = set(skip)
+
+    def wrap(name: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def timed(self, *args, **kwargs):
+            metrics = self.metrics
+            local = metrics._local
+            outermost = getattr(local, "method", None) is None
+            if outermost:
+                local.method = name
+            start = _clock()
+            failed = True
+            try:
+                result = function(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metrics.record_method(name, _clock() - start, failed)
+                if outermost:
+                    local.method = None
+        return timed
+
+    def decorate(cls: type) -> type:
+        for name, value in list(vars(cls).items()):
+            if not name.startswith("_") and name not in skip and callable(value) \
+                    and not isinstance(value, (staticmethod, classmethod, type)):
+                setattr(cls, name, wrap(name, value))
+        return cls
+
+    return decorate
+
+
+def write_prometheus_file(path: str, text: str):
+    """Atomically replace path with text, for a node_exporter textfile collector."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".prom")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """"9464" -> ("127.0.0.1", 9464); "0.0.0.0:9464" -> ("0.0.0.0", 9464)."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class MetricsExporter:
+    """Publish render() as Prometheus text to a file every interval seconds,
+    an HTTP /metrics endpoint, or both, from daemon threads."""
+
+    def __init__(self, render: Callable[[], str], path: Optional[str] = None,
+                 address: Optional[Tuple[str, int]] = None, interval: float = 15.0):
+        self.render = render
+        self.path = path
+        self.address = address
+        self.interval = interval
+        self.server: Optional[http.server.ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def start(self) -> "MetricsExporter":
+        if self.path:
+            threading.Thread(target=self._write_loop, name="metrics-file", daemon=True).start()
+        if self.address:
+            render = self.render
+
+            class Handler(http.server.BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?", 1)[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.server = http.server.ThreadingHTTPServer(self.address, Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        return self
+
+    def _write_loop(self):
+        while True:
+            write_prometheus_file(self.path, self.render())
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
@@ -1,6 +1,7 @@
 """Data models for How To Work A Cat kitten-care guide."""
+import json
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
 
@@ -34,6 +35,7 @@ class Step:
     time_estimate: str
     red_flags: List[str]
     analogy: Optional[str] = None
+    guide_id: Optional[str] = None  # Guide with the full background, if any
 
 
 @dataclass
@@ -53,6 +55,59 @@ class Guide:
     do_list: List[str]
     dont_list: List[str]
 
+    @property
+    def first_analogy(self) -> Optional[str]:
+        """First analogy card, as shown on list-view cards."""
+        return self.analogy_cards[0] if self.analogy_cards else None
+
+
+@dataclass
+class RenderedGuide:
+    """Guide HTML rendered at ingest time, ready for st.markdown."""
+    body_html: str
+    do_dont_html: str  # "" when the guide has no do/don't lists
+
+
+class GuideSummary:
+    """Compact guide projection for list views.
+
+    Carries only what a guide card shows - no markdown body - and decodes the
+    JSON topics list the first time it is read rather than on load.
+    """
+    __slots__ = (
+        "id", "title", "summary", "urgency", "age_min_weeks", "age_max_weeks",
+        "first_analogy", "bookmarked_at", "_topics_json", "_topics",
+    )
+
+    def __init__(self, id: str, title: str, summary: str, urgency: str,
+                 age_min_weeks: Optional[int], age_max_weeks: Optional[int],
+                 topics_json: Optional[str], first_analogy: Optional[str] = None,
+                 bookmarked_at: Optional[str] = None):
+        self.id = id
+        self.title = title
+        self.summary = summary
+        self.urgency = urgency
+        self.age_min_weeks = age_min_weeks
+        self.age_max_weeks = age_max_weeks
+        self.first_analogy = first_analogy
+        self.bookmarked_at = bookmarked_at  # ISO timestamp, set on bookmark listings
+        self._topics_json = topics_json
+        self._topics = None
+
+    @property
+    def topics(self) -> List[str]:
+        """Guide topics, decoded from JSON on first access."""
+        if self._topics is None:
+            self._topics = json.loads(self._topics_json) if self._topics_json else []
+        return self._topics
+
+    def __repr__(self) -> str:
+        return f"GuideSummary(id={self.id!r}, title={self.title!r})"
+
+
+# Id of the onboarding flow shown on the Kitten Ops Manual page
+OPS_MANUAL_FLOW_ID = "kitten-ops-manual"
+
 
 @dataclass
 class StepFlow:
@@ -74,6 +129,22 @@ class Bookmark:
 @dataclass
 class SearchResult:
     """Search result with scoring."""
-    guide: Guide
+    guide: Union[Guide, GuideSummary]
     score: float
-    match_type: str  # "title", "tags", "body"
+    match_type: str  # "title", "tags", "body", or "filters" for a filter-only listing
+
+
+@dataclass
+class FacetedSearch:
+    """A page of search results with facet counts over all the matches."""
+    results: List[SearchResult]
+    total: int  # Matches with every filter applied
+    facets: Dict[str, Dict[str, int]]  # Facet -> value -> matches if that value were chosen
+
+
+@dataclass
+class Suggestion:
+    """Search box autocomplete suggestion."""
+    text: str
+    kind: str  # "topic", "title", "tip" or "word"
+    guides: int  # Number of guides it comes from
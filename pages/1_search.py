@@ -1,6 +1,7 @@
 """Search page - find guides by keywords and filters (v2)."""
 import streamlit as st
-from database import KittenGuideDB
+from db_service import get_db, get_user_id, guide_count, guide_summaries, parse_kitten_age, search_cursor
+from ui import Pager, inject_css
 
 st.set_page_config(
     page_title="Search - How to Work a Cat",
@@ -8,66 +9,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# V2 CSS
-st.markdown("""
-<style>
-    :root {
-        --cat-orange: #F07A33;
-        --cat-teal:   #3AAFA9;
-        --cat-purple: #7B5EA7;
-        --cat-red:    #E84040;
-    }
-    .search-hero {
-        background: linear-gradient(135deg, #F07A33 0%, #7B5EA7 100%);
-        border-radius: 14px;
-        padding: 1.4rem 2rem;
-        color: white;
-        margin-bottom: 1.2rem;
-    }
-    .search-hero h2 { margin: 0; font-size: 2rem; font-weight: 900; }
-    .search-hero p  { margin: 0.3rem 0 0; opacity: 0.9; }
-    .guide-card {
-        border: none;
-        border-radius: 12px;
-        padding: 1.1rem 1.3rem;
-        margin: 0.6rem 0;
-        background-color: #FFFFFF;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.07);
-    }
-    .topic-badge {
-        display: inline-block;
-        background-color: var(--cat-teal);
-        color: white;
-        padding: 0.2rem 0.55rem;
-        border-radius: 12px;
-        font-size: 0.78rem;
-        margin-right: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-    .urgency-now {
-        background-color: var(--cat-red);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-    .urgency-today {
-        background-color: var(--cat-orange);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-@st.cache_resource
-def get_db():
-    return KittenGuideDB()
+# V2 CSS (styles/search.css)
+inject_css("search")
 
+# Shared database for the whole app
 db = get_db()
 
 st.markdown("""
@@ -77,81 +22,132 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+
+def use_query(query: str):
+    """Search for query: fill the search box (before it is drawn, or from a
+    button callback) and remember it for when the visitor comes back."""
+    st.session_state['search_query'] = query
+    st.session_state['search_box'] = query
+
+
 # Quick search chips
 st.markdown("#### 🚨 Quick Searches")
 chip_col1, chip_col2, chip_col3, chip_col4 = st.columns(4)
 
 with chip_col1:
     if st.button("Not eating", use_container_width=True):
-        st.session_state['search_query'] = 'eating food'
+        use_query('eating food')
 
 with chip_col2:
     if st.button("Litter issues", use_container_width=True):
-        st.session_state['search_query'] = 'litter tray'
+        use_query('litter tray')
 
 with chip_col3:
     if st.button("Biting", use_container_width=True):
-        st.session_state['search_query'] = 'biting'
+        use_query('biting')
 
 with chip_col4:
     if st.button("Scratching", use_container_width=True):
-        st.session_state['search_query'] = 'scratching'
+        use_query('scratching')
 
 chip_col5, chip_col6, chip_col7, chip_col8 = st.columns(4)
 
 with chip_col5:
     if st.button("Hiding", use_container_width=True):
-        st.session_state['search_query'] = 'hiding scared'
+        use_query('hiding')
 
 with chip_col6:
     if st.button("Zoomies", use_container_width=True):
-        st.session_state['search_query'] = 'zoomies 2am night'
+        use_query('zoomies 2am night')
 
 with chip_col7:
     if st.button("First 24 hours", use_container_width=True):
-        st.session_state['search_query'] = 'first day home'
+        use_query('first 24 hours')
 
 with chip_col8:
     if st.button("Emergency", use_container_width=True):
-        st.session_state['search_query'] = 'vet emergency'
+        use_query('vet emergency')
 
 st.markdown("---")
 
-# Search filters
-col1, col2, col3 = st.columns([2, 1, 1])
+# Search box and filters. The filters are drawn after the search runs, so
+# each option can show how many guides it would leave
+col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
 
 with col1:
+    # Keyed, so the box keeps what was typed from run to run; search_query
+    # outlives the widget when the visitor goes to another page and back
+    if 'search_box' not in st.session_state:
+        st.session_state['search_box'] = st.session_state.get('search_query', '')
     search_query = st.text_input(
         "Search for help",
-        value=st.session_state.get('search_query', ''),
-        placeholder="e.g., kitten won't eat, litter tray training, biting hands..."
+        placeholder="e.g., kitten won't eat, litter tray training, biting hands...",
+        key="search_box"
     )
+    st.session_state['search_query'] = search_query
     if search_query:
-        st.session_state['search_query'] = search_query
-
-with col2:
-    topic_filter = st.selectbox(
-        "Topic",
-        ["All Topics", "Behaviour", "Health", "Feeding", "Litter", "Play", "Sleep", "Emergency", "Onboarding", "Enrichment"]
-    )
-
-with col3:
-    urgency_filter = st.selectbox(
-        "Urgency",
-        ["All", "Now", "Today", "Monitor"]
-    )
+        # Autocomplete from guide titles, topics, tips and words: complete the
+        # whole query, or failing that its last word
+        typed = " ".join(search_query.split())
+        head, _, last = typed.rpartition(" ")
+        completions = [suggestion.text for suggestion in db.suggest(typed, k=4)]
+        if not completions and head:
+            completions = [f"{head} {suggestion.text}" for suggestion in db.suggest(last, k=8)
+                           if suggestion.kind in ("word", "topic")][:4]
+        completions = [text for text in completions if text.lower() != typed.lower()]
+        if completions:
+            st.caption("Try:")
+            for number, (column, text) in enumerate(zip(st.columns(len(completions)), completions)):
+                label = text if len(text) <= 40 else text[:39] + "…"
+                column.button(label, key=f"suggest_{number}", on_click=use_query, args=(text,),
+                              use_container_width=True)
+
+# (column, label, "no filter" option, session state key) per facet
+FACET_FILTERS = {
+    "topic": (col2, "Topic", "All Topics", "search_topic"),
+    "urgency": (col3, "Urgency", "All", "search_urgency"),
+    "age": (col4, "Kitten age", "Any age", "search_age"),
+}
 
 # Perform search
 if search_query:
-    topic = None if topic_filter == "All Topics" else topic_filter
-    urgency = None if urgency_filter == "All" else urgency_filter
+    filters = {facet: st.session_state.get(key) for facet, (_, _, _, key) in FACET_FILTERS.items()}
+    # "9-week-old biting" searches for biting among guides that suit a 9-week-old
+    age_weeks, search_terms = parse_kitten_age(search_query)
+    
+    # One page of results at a time; a new query or filter starts again from the first.
+    # Facet counts for every filter come back with the page
+    pager = Pager("search_pager", scope=(search_query, tuple(filters.values())))
+    search = db.search_faceted(
+        search_terms, {**filters, "age_weeks": age_weeks}, after=pager.after, limit=pager.limit
+    )
+    results, has_more = pager.split(search.results)
+    total_results = search.total
     
-    results = db.search_guides(search_query, topic=topic, urgency=urgency)
+    for facet, (column, label, anything, key) in FACET_FILTERS.items():
+        counts = search.facets[facet]
+        options = [None] + list(counts)
+        if filters[facet] and filters[facet] not in counts:
+            options.append(filters[facet])  # keep the current choice, now matching nothing
+        with column:
+            # The counts change the options, which makes a new widget each time,
+            # so carry the choice over explicitly
+            st.selectbox(
+                label, options, index=options.index(filters[facet]), key=key,
+                format_func=lambda value, counts=counts, anything=anything: (
+                    anything if value is None else f"{value} ({counts.get(value, 0)})"
+                ),
+            )
     
-    st.markdown(f"### Found {len(results)} result(s)")
+    st.markdown(f"### Found {total_results} result(s)")
+    if age_weeks is not None:
+        st.caption(f"📅 Showing guides that suit a {age_weeks}-week-old kitten")
     
     if results:
-        for guide in results:
+        # One batched lookup for the saved stars rather than one per card
+        saved_ids = db.are_bookmarked(get_user_id(), [result.guide.id for result in results])
+        for result in results:
+            guide = result.guide
             with st.container():
                 st.markdown('<div class="guide-card">', unsafe_allow_html=True)
                 
@@ -160,7 +156,8 @@ if search_query:
                     urgency_class = f"urgency-{guide.urgency.lower()}"
                     st.markdown(f'<span class="{urgency_class}">{guide.urgency}</span>', unsafe_allow_html=True)
                 
-                st.markdown(f"### {guide.title}")
+                saved_star = " ⭐" if guide.id in saved_ids else ""
+                st.markdown(f"### {guide.title}{saved_star}")
                 st.markdown(f"*{guide.summary}*")
                 
                 # Topic badges
@@ -169,14 +166,16 @@ if search_query:
                     st.markdown(topic_html, unsafe_allow_html=True)
                 
                 # Analogy preview
-                if guide.analogy_cards:
-                    st.caption(f"💡 {guide.analogy_cards[0]}")
+                if guide.first_analogy:
+                    st.caption(f"💡 {guide.first_analogy}")
                 
                 if st.button(f"Read guide", key=f"search_{guide.id}", use_container_width=True):
                     st.session_state['selected_guide'] = guide.id
                     st.switch_page("pages/guide_viewer.py")
                 
                 st.markdown('</div>', unsafe_allow_html=True)
+        
+        pager.controls(search_cursor(results[-1]), has_more, total_results)
     else:
         st.info("No guides found. Try different search terms or browse the library.")
         if st.button("📖 Browse Library"):
@@ -186,9 +185,9 @@ else:
     st.markdown("### 💡 Browse All Guides")
     st.caption("Or use the search box above to find specific help")
     
-    all_guides = db.get_all_guides()
+    first_guides = guide_summaries(limit=5)
     
-    for guide in all_guides[:5]:  # Show first 5
+    for guide in first_guides:
         with st.container():
             st.markdown('<div class="guide-card">', unsafe_allow_html=True)
             
@@ -209,7 +208,8 @@ else:
             
             st.markdown('</div>', unsafe_allow_html=True)
     
-    if len(all_guides) > 5:
-        st.caption(f"... and {len(all_guides) - 5} more guides")
+    total_guides = guide_count()
+    if total_guides > len(first_guides):
+        st.caption(f"... and {total_guides - len(first_guides)} more guides")
         if st.button("📖 View All in Library"):
             st.switch_page("pages/2_library.py")
@@ -1,6 +1,7 @@
 """Library page - browse guides by topic (v2)."""
 import streamlit as st
-from database import KittenGuideDB
+from db_service import get_db, get_user_id, guide_count, guide_summaries, listing_cursor, topic_counts
+from ui import Pager, inject_css
 
 st.set_page_config(
     page_title="Library - How to Work a Cat",
@@ -8,67 +9,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# V2 CSS
-st.markdown("""
-<style>
-    :root {
-        --cat-orange: #F07A33;
-        --cat-teal:   #3AAFA9;
-        --cat-purple: #7B5EA7;
-        --cat-red:    #E84040;
-        --cat-green:  #5BAD8B;
-    }
-    .library-hero {
-        background: linear-gradient(135deg, #5BAD8B 0%, #3AAFA9 100%);
-        border-radius: 14px;
-        padding: 1.4rem 2rem;
-        color: white;
-        margin-bottom: 1.2rem;
-    }
-    .library-hero h2 { margin: 0; font-size: 2rem; font-weight: 900; }
-    .library-hero p  { margin: 0.3rem 0 0; opacity: 0.9; }
-    .guide-card {
-        border: none;
-        border-radius: 12px;
-        padding: 1.1rem 1.3rem;
-        margin: 0.6rem 0;
-        background-color: #FFFFFF;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.07);
-    }
-    .topic-badge {
-        display: inline-block;
-        background-color: var(--cat-teal);
-        color: white;
-        padding: 0.2rem 0.55rem;
-        border-radius: 12px;
-        font-size: 0.78rem;
-        margin-right: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-    .urgency-now {
-        background-color: var(--cat-red);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-    .urgency-today {
-        background-color: var(--cat-orange);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-@st.cache_resource
-def get_db():
-    return KittenGuideDB()
+# V2 CSS (styles/library.css)
+inject_css("library")
 
+# Shared database for the whole app
 db = get_db()
 
 st.markdown("""
@@ -78,43 +22,58 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Get all guides
-all_guides = db.get_all_guides()
+# Topic counts come straight from the database - no need to load every guide -
+# and, like the guide list, are shared by every session until content changes
+counts_by_topic = topic_counts()
+total_guides = guide_count()
 
 # Manage topic selection in session state
-topic_options = ["All Topics"]
-# Organize by topic
-topics = {}
-for guide in all_guides:
-    for topic in guide.topics:
-        if topic not in topics:
-            topics[topic] = []
-        topics[topic].append(guide)
-        if topic not in topic_options:
-            topic_options.append(topic)
-topic_options = topic_options[:1] + sorted(topic_options[1:])
+topic_options = ["All Topics"] + sorted(counts_by_topic)
 
-if "library_selected_topic" not in st.session_state:
+if st.session_state.get("library_selected_topic") not in topic_options:
     st.session_state["library_selected_topic"] = "All Topics"
 
-# Topic filter
+# Topic and kitten age filters
 st.markdown("### Filter by Topic")
-selected_topic = st.selectbox(
-    "Choose a topic",
-    topic_options,
-    index=topic_options.index(st.session_state["library_selected_topic"]),
-    key="library_selected_topic"
-)
+topic_col, age_col = st.columns([2, 1])
+with topic_col:
+    selected_topic = st.selectbox(
+        "Choose a topic",
+        topic_options,
+        index=topic_options.index(st.session_state["library_selected_topic"]),
+        key="library_selected_topic"
+    )
+with age_col:
+    age_weeks = st.number_input(
+        "Kitten's age (weeks)",
+        min_value=0,
+        max_value=520,
+        value=None,
+        step=1,
+        placeholder="Any age",
+        key="library_age_weeks"
+    )
 
-if selected_topic == "All Topics":
-    guides_to_show = all_guides
+topic = None if selected_topic == "All Topics" else selected_topic
+if age_weeks is None:
+    topic_total = total_guides if topic is None else counts_by_topic.get(topic, 0)
 else:
-    guides_to_show = topics[selected_topic]
+    topic_total = guide_count(topic, age_weeks)
 
-st.markdown(f"### Showing {len(guides_to_show)} guide(s)")
+# One page of cards at a time, most urgent first; the pager starts again when a filter changes
+pager = Pager("library_pager", scope=(topic, age_weeks))
+guides_to_show, has_more = pager.split(
+    guide_summaries(topic=topic, age_weeks=age_weeks, after=pager.after, limit=pager.limit)
+)
+
+age_note = f" for a {age_weeks}-week-old" if age_weeks is not None else ""
+st.markdown(f"### Showing {len(guides_to_show)} of {topic_total} guide(s){age_note}")
 
-# Display guides
-for guide in sorted(guides_to_show, key=lambda g: g.title):
+# Saved stars for every card in one batched lookup
+saved_ids = db.are_bookmarked(get_user_id(), [guide.id for guide in guides_to_show])
+
+# Display guides (already in listing order)
+for guide in guides_to_show:
     with st.container():
         st.markdown('<div class="guide-card">', unsafe_allow_html=True)
         
@@ -123,7 +82,8 @@ for guide in sorted(guides_to_show, key=lambda g: g.title):
             urgency_class = f"urgency-{guide.urgency.lower()}"
             st.markdown(f'<span class="{urgency_class}">{guide.urgency}</span>', unsafe_allow_html=True)
         
-        st.markdown(f"### {guide.title}")
+        saved_star = " ⭐" if guide.id in saved_ids else ""
+        st.markdown(f"### {guide.title}{saved_star}")
         st.markdown(f"*{guide.summary}*")
         
         # Topic badges
@@ -138,8 +98,8 @@ for guide in sorted(guides_to_show, key=lambda g: g.title):
             st.caption(f"📅 {age_min}-{age_max} weeks")
         
         # Analogy preview
-        if guide.analogy_cards:
-            st.caption(f"💡 {guide.analogy_cards[0]}")
+        if guide.first_analogy:
+            st.caption(f"💡 {guide.first_analogy}")
         
         if st.button(f"Read guide", key=f"lib_{guide.id}", use_container_width=True):
             st.session_state['selected_guide'] = guide.id
@@ -147,11 +107,13 @@ for guide in sorted(guides_to_show, key=lambda g: g.title):
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+if guides_to_show:
+    pager.controls(listing_cursor(guides_to_show[-1]), has_more, topic_total)
+
 # Topic overview in sidebar (display only, filtering handled by selectbox above)
 with st.sidebar:
     st.markdown("### 📚 Topics Overview")
-    st.markdown(f"**All Topics** ({len(all_guides)} guides)")
+    st.markdown(f"**All Topics** ({total_guides} guides)")
     st.markdown("---")
-    for topic in sorted(topics.keys()):
-        count = len(topics[topic])
+    for topic, count in counts_by_topic.items():
         st.markdown(f"**{topic}** ({count} guides)")
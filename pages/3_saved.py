@@ -1,6 +1,7 @@
 """Saved guides page - user bookmarks (v2)."""
 import streamlit as st
-from database import KittenGuideDB
+from db_service import get_db, get_user_id
+from ui import Pager, inject_css
 
 st.set_page_config(
     page_title="Saved - How to Work a Cat",
@@ -8,67 +9,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# V2 CSS
-st.markdown("""
-<style>
-    :root {
-        --cat-orange: #F07A33;
-        --cat-teal:   #3AAFA9;
-        --cat-purple: #7B5EA7;
-        --cat-red:    #E84040;
-        --cat-yellow: #F5C842;
-    }
-    .saved-hero {
-        background: linear-gradient(135deg, #F5C842 0%, #F07A33 100%);
-        border-radius: 14px;
-        padding: 1.4rem 2rem;
-        color: white;
-        margin-bottom: 1.2rem;
-    }
-    .saved-hero h2 { margin: 0; font-size: 2rem; font-weight: 900; }
-    .saved-hero p  { margin: 0.3rem 0 0; opacity: 0.9; }
-    .guide-card {
-        border: none;
-        border-radius: 12px;
-        padding: 1.1rem 1.3rem;
-        margin: 0.6rem 0;
-        background-color: #FFFFFF;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.07);
-    }
-    .topic-badge {
-        display: inline-block;
-        background-color: var(--cat-teal);
-        color: white;
-        padding: 0.2rem 0.55rem;
-        border-radius: 12px;
-        font-size: 0.78rem;
-        margin-right: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-    .urgency-now {
-        background-color: var(--cat-red);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-    .urgency-today {
-        background-color: var(--cat-orange);
-        color: white;
-        padding: 0.2rem 0.6rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-@st.cache_resource
-def get_db():
-    return KittenGuideDB()
+# V2 CSS (styles/saved.css)
+inject_css("saved")
 
+# Shared database for the whole app
 db = get_db()
 
 st.markdown("""
@@ -78,8 +22,16 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Get bookmarked guides
-bookmarked_guides = db.get_bookmarked_guides()
+# Get one page of bookmarked guides, newest first
+user_id = get_user_id()
+pager = Pager("saved_pager", scope=user_id)
+bookmarked_guides, has_more = pager.split(
+    db.get_bookmarked_summaries(user_id, after=pager.after, limit=pager.limit)
+)
+if not bookmarked_guides and pager.number > 1:
+    # Removing the last guide on a page leaves it empty; go back one
+    pager.cursors.pop()
+    st.rerun()
 
 if not bookmarked_guides:
     st.info("You haven't saved any guides yet. Browse the library or search for guides and click the ☆ Save button.")
@@ -92,7 +44,8 @@ if not bookmarked_guides:
         if st.button("📖 Browse Library", use_container_width=True):
             st.switch_page("pages/2_library.py")
 else:
-    st.markdown(f"### {len(bookmarked_guides)} saved guide(s)")
+    total_saved = db.bookmark_count(user_id)
+    st.markdown(f"### {total_saved} saved guide(s)")
     
     for guide in bookmarked_guides:
         with st.container():
@@ -112,8 +65,8 @@ else:
                 st.markdown(topic_html, unsafe_allow_html=True)
             
             # Analogy preview
-            if guide.analogy_cards:
-                st.caption(f"💡 {guide.analogy_cards[0]}")
+            if guide.first_analogy:
+                st.caption(f"💡 {guide.first_analogy}")
             
             # Action buttons
             btn_col1, btn_col2 = st.columns([3, 1])
@@ -123,7 +76,10 @@ else:
                     st.switch_page("pages/guide_viewer.py")
             with btn_col2:
                 if st.button(f"🗑️ Remove", key=f"remove_{guide.id}", use_container_width=True):
-                    db.remove_bookmark(guide.id)
+                    db.remove_bookmark(guide.id, user_id)
                     st.rerun()
             
             st.markdown('</div>', unsafe_allow_html=True)
+    
+    last = bookmarked_guides[-1]
+    pager.controls((last.bookmarked_at, last.id), has_more, total_saved)
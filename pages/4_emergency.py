@@ -1,6 +1,7 @@
 """Emergency page - when to call vet NOW (v2)."""
 import streamlit as st
-from database import KittenGuideDB
+from db_service import get_db
+from ui import inject_css
 
 st.set_page_config(
     page_title="Emergency - How to Work a Cat",
@@ -8,34 +9,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# V2 CSS for emergency styling
-st.markdown("""
-<style>
-    .emergency-hero {
-        background: linear-gradient(135deg, #E84040 0%, #b01010 100%);
-        border-radius: 14px;
-        padding: 1.8rem 2rem;
-        color: white;
-        text-align: center;
-        margin-bottom: 1.5rem;
-    }
-    .emergency-hero h1 { font-size: 2.4rem; margin: 0; font-weight: 900; }
-    .emergency-hero p  { margin: 0.5rem 0 0; font-size: 1.1rem; opacity: 0.92; }
-    .warning-box {
-        border: 3px solid #E84040;
-        border-radius: 12px;
-        padding: 1rem;
-        background-color: #fff5f5;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-@st.cache_resource
-def get_db():
-    return KittenGuideDB()
+# V2 CSS for emergency styling (styles/emergency.css)
+inject_css("emergency")
 
+# Shared database for the whole app
 db = get_db()
 
 # Emergency header
@@ -47,10 +24,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Get emergency guide
-emergency_guide = db.get_guide("emergency-vet-now")
+emergency_html = db.get_guide_html("emergency-vet-now")
 
-if emergency_guide:
-    st.markdown(emergency_guide.markdown_body)
+if emergency_html:
+    st.markdown(emergency_html.body_html, unsafe_allow_html=True)
 else:
     st.error("Emergency guide not found in database")
 
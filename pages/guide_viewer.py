@@ -1,6 +1,8 @@
 """Guide viewer page - displays individual guide content (v2)."""
+import html
 import streamlit as st
-from database import KittenGuideDB
+from db_service import get_db, get_user_id
+from ui import inject_css
 
 st.set_page_config(
     page_title="Guide - How to Work a Cat",
@@ -8,91 +10,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# V2 CSS
-st.markdown("""
-<style>
-    :root {
-        --cat-orange: #F07A33;
-        --cat-teal:   #3AAFA9;
-        --cat-purple: #7B5EA7;
-        --cat-red:    #E84040;
-        --cat-green:  #5BAD8B;
-    }
-    .guide-hero {
-        background: linear-gradient(135deg, var(--cat-teal) 0%, var(--cat-purple) 100%);
-        border-radius: 14px;
-        padding: 1.5rem 2rem;
-        color: white;
-        margin-bottom: 1.2rem;
-    }
-    .guide-hero h1 { margin: 0; font-size: 1.9rem; font-weight: 900; }
-    .guide-hero p  { margin: 0.3rem 0 0; opacity: 0.9; font-size: 1.05rem; }
-
-    .urgency-now {
-        background-color: var(--cat-red);
-        color: white;
-        padding: 0.3rem 0.9rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.85rem;
-        display: inline-block;
-        margin-bottom: 0.6rem;
-    }
-    .urgency-today {
-        background-color: var(--cat-orange);
-        color: white;
-        padding: 0.3rem 0.9rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.85rem;
-        display: inline-block;
-        margin-bottom: 0.6rem;
-    }
-    .topic-badge {
-        display: inline-block;
-        background-color: var(--cat-teal);
-        color: white;
-        padding: 0.2rem 0.55rem;
-        border-radius: 12px;
-        font-size: 0.78rem;
-        margin-right: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-    .do-dont-row {
-        display: flex;
-        gap: 1rem;
-        margin: 1rem 0;
-    }
-    .do-box {
-        flex: 1;
-        background: #f0fbf6;
-        border: 2px solid var(--cat-green);
-        border-radius: 10px;
-        padding: 0.8rem 1rem;
-    }
-    .dont-box {
-        flex: 1;
-        background: #fff5f5;
-        border: 2px solid var(--cat-red);
-        border-radius: 10px;
-        padding: 0.8rem 1rem;
-    }
-    .do-box h4, .dont-box h4 { margin: 0 0 0.4rem; }
-    .related-card {
-        border-radius: 10px;
-        padding: 0.7rem 1rem;
-        background: #f9f9f9;
-        border: 1px solid #e0e0e0;
-        margin-bottom: 0.3rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-@st.cache_resource
-def get_db():
-    return KittenGuideDB()
+# V2 CSS (styles/guide_viewer.css)
+inject_css("guide_viewer")
 
+# Shared database for the whole app
 db = get_db()
 
 # Get selected guide from session state
@@ -114,20 +35,21 @@ if not guide:
     st.stop()
 
 # Back button and bookmark
+user_id = get_user_id()
 col1, col2, col3 = st.columns([1, 4, 1])
 with col1:
     if st.button("← Back"):
         st.switch_page("app.py")
 
 with col3:
-    is_bookmarked = db.is_bookmarked(guide.id)
+    is_bookmarked = db.is_bookmarked(guide.id, user_id)
     if is_bookmarked:
         if st.button("⭐ Saved", use_container_width=True):
-            db.remove_bookmark(guide.id)
+            db.remove_bookmark(guide.id, user_id)
             st.rerun()
     else:
         if st.button("☆ Save", use_container_width=True):
-            db.add_bookmark(guide.id)
+            db.add_bookmark(guide.id, user_id)
             st.rerun()
 
 # Track guide as read
@@ -160,26 +82,35 @@ st.markdown(f"""
 
 st.markdown("---")
 
-# Main content
-st.markdown(guide.markdown_body)
+# Main content, rendered to sanitised HTML when the guide was ingested
+rendered = db.get_guide_html(guide.id)
+if rendered:
+    st.markdown(rendered.body_html, unsafe_allow_html=True)
+else:
+    st.markdown(guide.markdown_body)
+
+# Diagram key (captions and hotspots for the diagrams in this guide)
+# (fetched separately: the guide itself is a shared cache entry)
+diagrams = db.get_diagrams([guide.id])[guide.id]
+if diagrams:
+    with st.expander(f"🗺️ Diagram key ({len(diagrams)})", expanded=False):
+        for diagram in diagrams:
+            hotspot_html = " ".join(
+                f'<span class="hotspot-badge">{html.escape(hotspot.replace("-", " "))}</span>'
+                for hotspot in diagram.hotspots
+            )
+            st.markdown(f"""
+<div class="diagram-card">
+<strong>{html.escape(diagram.caption)}</strong><br>
+<small style="color:#555">{html.escape(diagram.alt)}</small><br>
+{hotspot_html}
+</div>
+""", unsafe_allow_html=True)
 
 # Do / Don't visual cards (if available)
-if guide.do_list or guide.dont_list:
+if rendered and rendered.do_dont_html:
     st.markdown("---")
-    do_items   = "".join([f"<li>✅ {item}</li>" for item in guide.do_list])
-    dont_items = "".join([f"<li>❌ {item}</li>" for item in guide.dont_list])
-    st.markdown(f"""
-<div class="do-dont-row">
-  <div class="do-box">
-    <h4>✅ Do</h4>
-    <ul style="margin:0;padding-left:1.2rem">{do_items}</ul>
-  </div>
-  <div class="dont-box">
-    <h4>❌ Don't</h4>
-    <ul style="margin:0;padding-left:1.2rem">{dont_items}</ul>
-  </div>
-</div>
-""", unsafe_allow_html=True)
+    st.markdown(rendered.do_dont_html, unsafe_allow_html=True)
 
 st.markdown("---")
 
@@ -193,9 +124,8 @@ if guide.analogy_cards:
 st.markdown("### 📚 Related Topics")
 related_col1, related_col2, related_col3 = st.columns(3)
 
-# Suggest guides based on topics
-all_guides = db.get_all_guides()
-related = [g for g in all_guides if g.id != guide.id and any(t in guide.topics for t in g.topics)][:3]
+# Suggest guides from the precomputed related-guides index
+related = db.get_related(guide.id, k=3)
 
 if related:
     for idx, rel_guide in enumerate(related):
@@ -0,0 +1,72 @@
+"""Guide HTML rendering, done once at ingest time rather than on every rerun."""
+import html
+from functools import lru_cache
+from typing import List
+
+
+@lru_cache(maxsize=1)
+def _markdown():
+    """Shared Markdown renderer, built on first use."""
+    # markdown-it-py ships with Streamlit (via rich); imported lazily so
+    # starting the app doesn't pay for building the parser
+    from markdown_it import MarkdownIt
+    return MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+
+
+def render_markdown(text: str) -> str:
+    """Render guide Markdown to a sanitised HTML fragment.
+
+    Raw HTML in the source is escaped rather than passed through, and links
+    with unsafe schemes (javascript:, vbscript:, file:) are left as text, so
+    the fragment is safe to show with unsafe_allow_html.
+
+    st.markdown parses the fragment as Markdown again, so top-level blocks
+    are separated by blank lines: each then starts an HTML block of its own,
+    and a <pre> block runs to its </pre> rather than stopping at the first
+    blank line of an ASCII chart (see reparse_breaks).
+    """
+    markdown = _markdown()
+    env: dict = {}
+    tokens = markdown.parse(text or "", env)
+    blocks, start = [], 0
+    for index, token in enumerate(tokens):
+        if token.level == 0 and token.nesting <= 0:
+            blocks.append(markdown.renderer.render(tokens[start:index + 1], markdown.options, env))
+            start = index + 1
+    return "\n".join(blocks)
+
+
+def reparse_breaks(fragment: str) -> List[str]:
+    """Where a second Markdown parse of an HTML fragment stops treating it as HTML.
+
+    This is what st.markdown(..., unsafe_allow_html=True) does to a fragment;
+    anything that comes back as a paragraph or code block rather than raw HTML
+    is shown as text. Returns "line N: <token type>" for each such piece.
+    """
+    from markdown_it import MarkdownIt
+    tokens = MarkdownIt("commonmark", {"html": True}).parse(fragment)
+    return [
+        f"line {token.map[0] + 1}: {token.type}"
+        for token in tokens
+        if token.level == 0 and token.nesting >= 0 and token.type != "html_block"
+    ]
+
+
+def render_do_dont(do_list: List[str], dont_list: List[str]) -> str:
+    """The side-by-side Do / Don't cards, or "" when a guide has neither list."""
+    if not do_list and not dont_list:
+        return ""
+    do_items = "".join(f"<li>✅ {html.escape(item)}</li>" for item in do_list)
+    dont_items = "".join(f"<li>❌ {html.escape(item)}</li>" for item in dont_list)
+    return f"""
+<div class="do-dont-row">
+  <div class="do-box">
+    <h4>✅ Do</h4>
+    <ul style="margin:0;padding-left:1.2rem">{do_items}</ul>
+  </div>
+  <div class="dont-box">
+    <h4>❌ Don't</h4>
+    <ul style="margin:0;padding-left:1.2rem">{dont_items}</ul>
+  </div>
+</div>
+"""
@@ -0,0 +1,133 @@
+"""Cold-start profiler: import time and first-render time for every page.
+
+    python startup_profile.py                         # all pages, fresh database each
+    python startup_profile.py --budget-ms 1500 app.py pages/1_search.py
+    python startup_profile.py --db kitten_guide.db    # against an existing database
+    KITTEN_GUIDE_STARTUP=lazy python startup_profile.py --db kitten_guide.db
+
+Each page is measured in its own Python process, so module imports, the
+shared database and its content sync are as cold as in a freshly started
+container. Pages are rendered headlessly with Streamlit's AppTest. The run
+exits with status 1 if any page errors or goes over budget, so it can gate
+a CI job or an image build.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Imports plus first render, per page, in milliseconds
+DEFAULT_BUDGET_MS = float(os.environ.get("KITTEN_GUIDE_STARTUP_BUDGET_MS", "2000"))
+
+# Session state a page needs to render its real content rather than a prompt
+PAGE_STATE = {
+    "pages/guide_viewer.py": {"selected_guide": "first-24-hours"},
+}
+
+
+def default_pages() -> list:
+    """app.py followed by every page in pages/, in sidebar order."""
+    pages = sorted(path.relative_to(ROOT).as_posix() for path in (ROOT / "pages").glob("*.py"))
+    return ["app.py", *pages]
+
+
+def measure_page(page: str) -> dict:
+    """Time one page's imports and first render in the current (fresh) process."""
+    sys.path.insert(0, str(ROOT))
+
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    streamlit_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    import db_service  # noqa: F401
+    import ui  # noqa: F401
+    app_ms = (time.perf_counter() - start) * 1000
+
+    # The test harness is not part of a real start, so it is left out of both timings
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(ROOT / page), default_timeout=120)
+    for key, value in PAGE_STATE.get(page, {}).items():
+        app.session_state[key] = value
+    start = time.perf_counter()
+    app.run()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "page": page,
+        "streamlit_import_ms": round(streamlit_ms, 1),
+        "app_import_ms": round(app_ms, 1),
+        "import_ms": round(streamlit_ms + app_ms, 1),
+        "render_ms": round(render_ms, 1),
+        "total_ms": round(streamlit_ms + app_ms + render_ms, 1),
+        "content_loader_imported": "content_loader" in sys.modules,
+        "errors": [str(error.value) for error in app.exception],
+    }
+
+
+def profile_page(page: str, db_path: str = None) -> dict:
+    """Measure a page in a child process, against db_path or a brand-new database."""
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as scratch:
+        env["KITTEN_GUIDE_DB"] = db_path or os.path.join(scratch, "kitten_guide.db")
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--measure", page],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+    if completed.returncode != 0:
+        return {"page": page, "errors": [completed.stderr.strip() or "profiler child failed"]}
+    # The last line is the result; anything before it is the app's own output
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="pages to profile (default: all)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="cold-start budget per page, imports plus first render")
+    parser.add_argument("--db", help="profile against this database instead of a fresh one")
+    parser.add_argument("--json", metavar="PATH", help="also write the results here as JSON")
+    parser.add_argument("--measure", metavar="PAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure_page(args.measure)))
+        return 0
+
+    db_path = str(Path(args.db).resolve()) if args.db else None
+    results = []
+    failed = False
+    print(f"{'page':<32} {'import ms':>10} {'render ms':>10} {'total ms':>10}  "
+          f"budget {args.budget_ms:.0f} ms")
+    for page in args.pages or default_pages():
+        result = profile_page(page, db_path)
+        over = result.get("total_ms", float("inf")) > args.budget_ms
+        result["over_budget"] = over
+        failed = failed or over or bool(result["errors"])
+        results.append(result)
+        if "total_ms" in result:
+            status = "OVER" if over else "ok"
+            if result["errors"]:
+                status = "ERROR"
+            print(f"{page:<32} {result['import_ms']:>10.1f} {result['render_ms']:>10.1f} "
+                  f"{result['total_ms']:>10.1f}  {status}")
+        else:
+            print(f"{page:<32} {'-':>10} {'-':>10} {'-':>10}  ERROR")
+        for error in result["errors"]:
+            print(f"    {error.splitlines()[-1] if error else error}")
+
+    if args.json:
+        report = {"budget_ms": args.budget_ms, "db": db_path, "results": results}
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
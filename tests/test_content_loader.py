@@ -0,0 +1,95 @@
+"""Content sync: the database mirrors the guide pack and the step flow files.
+
+Run from the repository root with `python -m unittest discover tests`.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from content_loader import BUNDLED_CONTENT_DIR, BUNDLED_FLOWS_DIR, sync_content_pack, sync_step_flows
+from database import DEFAULT_USER_ID, KittenGuideDB
+from models import OPS_MANUAL_FLOW_ID
+
+
+class SyncContentPackTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.pack = self.directory / "guides"
+        shutil.copytree(BUNDLED_CONTENT_DIR, self.pack)
+        self.db = KittenGuideDB(str(self.directory / "kitten_guide.db"))
+        sync_content_pack(self.db, self.pack)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def guide_ids(self):
+        return set(self.db.content_manifest())
+
+    def test_unchanged_pack_writes_nothing(self):
+        version = self.db.content_version()
+        os.utime(self.pack / "zoomies-2am.md")
+        report = sync_content_pack(self.db, self.pack)
+        self.assertEqual((report["written"], report["removed"]), (0, 0))
+        self.assertEqual(self.db.content_version(), version)
+
+    def test_edited_id_replaces_the_old_guide(self):
+        path = self.pack / "zoomies-2am.md"
+        path.write_text(path.read_text(encoding="utf-8").replace("id: zoomies-2am", "id: zoomies-night"),
+                        encoding="utf-8")
+        report = sync_content_pack(self.db, self.pack)
+        self.assertEqual((report["written"], report["removed"]), (1, 1))
+        self.assertIn("zoomies-night", self.guide_ids())
+        self.assertNotIn("zoomies-2am", self.guide_ids())
+
+    def test_moved_pack_still_removes_deleted_guides(self):
+        moved = self.directory / "moved"
+        shutil.move(str(self.pack), str(moved))
+        (moved / "zoomies-2am.md").unlink()
+        report = sync_content_pack(self.db, moved)
+        self.assertEqual((report["read"], report["written"], report["removed"]), (0, 0, 1))
+        self.assertNotIn("zoomies-2am", self.guide_ids())
+
+
+class SyncStepFlowsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.flows = self.directory / "flows"
+        shutil.copytree(BUNDLED_FLOWS_DIR, self.flows)
+        self.db = KittenGuideDB(str(self.directory / "kitten_guide.db"))
+        sync_step_flows(self.db, self.flows)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_unchanged_flows_write_nothing(self):
+        version = self.db.content_version()
+        report = sync_step_flows(self.db, self.flows)
+        self.assertEqual((report["written"], report["removed"]), (0, 0))
+        self.assertEqual(self.db.content_version(), version)
+
+    def test_edited_flow_reaches_the_database_and_keeps_progress(self):
+        self.db.set_step_done(DEFAULT_USER_ID, OPS_MANUAL_FLOW_ID, "ops-step-1")
+        path = self.flows / "kitten-ops-manual.yaml"
+        path.write_text(path.read_text(encoding="utf-8").replace("Litter tray setup", "Litter tray set-up"),
+                        encoding="utf-8")
+        report = sync_step_flows(self.db, self.flows)
+        self.assertEqual(report["written"], 1)
+        flow = self.db.get_step_flow(OPS_MANUAL_FLOW_ID)
+        self.assertEqual(flow.steps[2].title, "Litter tray set-up")
+        self.assertEqual(self.db.get_step_progress(DEFAULT_USER_ID, OPS_MANUAL_FLOW_ID), {"ops-step-1"})
+
+    def test_removed_flow_file_deletes_the_flow(self):
+        (self.flows / "kitten-ops-manual.yaml").unlink()
+        report = sync_step_flows(self.db, self.flows)
+        self.assertEqual(report["removed"], 1)
+        self.assertIsNone(self.db.get_step_flow(OPS_MANUAL_FLOW_ID))
+
+
+if __name__ == "__main__":
+    unittest.main()
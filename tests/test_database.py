@@ -0,0 +1,267 @@
+"""Schema tests: the hot queries stay indexed, and old databases upgrade in place.
+
+Run from the repository root with `python -m unittest discover tests`.
+"""
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from content_loader import sync_content_pack, sync_step_flows
+from database import DEFAULT_USER_ID, SCHEMA_VERSION, KittenGuideDB, _summary_columns
+
+
+# The schema kitten_guide.db files were created with before PRAGMA
+# user_version migrations existed (user_version 0)
+BASELINE_SCHEMA = """
+    CREATE TABLE guides (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        summary TEXT,
+        markdown_body TEXT,
+        topics TEXT,
+        age_min_weeks INTEGER,
+        age_max_weeks INTEGER,
+        urgency TEXT,
+        analogy_cards TEXT,
+        do_list TEXT,
+        dont_list TEXT,
+        updated_at TEXT
+    );
+    CREATE TABLE search_index (
+        doc_id TEXT PRIMARY KEY,
+        title TEXT,
+        plain_body TEXT,
+        tags TEXT,
+        age_range TEXT,
+        topic TEXT,
+        urgency_boost INTEGER,
+        FOREIGN KEY (doc_id) REFERENCES guides(id)
+    );
+    CREATE TABLE diagrams (
+        id TEXT PRIMARY KEY,
+        guide_id TEXT,
+        asset_ref TEXT,
+        alt TEXT,
+        caption TEXT,
+        hotspots TEXT,
+        FOREIGN KEY (guide_id) REFERENCES guides(id)
+    );
+    CREATE TABLE step_flows (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        progress INTEGER DEFAULT 0
+    );
+    CREATE TABLE steps (
+        id TEXT PRIMARY KEY,
+        flow_id TEXT,
+        title TEXT NOT NULL,
+        instructions TEXT,
+        examples TEXT,
+        time_estimate TEXT,
+        red_flags TEXT,
+        analogy TEXT,
+        step_order INTEGER,
+        FOREIGN KEY (flow_id) REFERENCES step_flows(id)
+    );
+    CREATE TABLE checklist_items (
+        id TEXT PRIMARY KEY,
+        step_id TEXT,
+        text TEXT,
+        completed INTEGER DEFAULT 0,
+        FOREIGN KEY (step_id) REFERENCES steps(id)
+    );
+    CREATE TABLE bookmarks (
+        guide_id TEXT PRIMARY KEY,
+        created_at TEXT,
+        FOREIGN KEY (guide_id) REFERENCES guides(id)
+    );
+"""
+
+# (id, title, topics, urgency, urgency_boost) of the guides in the baseline database
+BASELINE_GUIDES = [
+    ("litter-basics", "Litter Tray Basics", ["Litter", "Onboarding"], "Today", 2),
+    ("litter-accidents", "Accidents Outside the Tray", ["Litter", "Health"], "Monitor", 0),
+    ("night-zoomies", "Zoomies at 2am", ["Play", "Sleep"], "", 0),
+]
+
+
+def _seed_baseline(path: Path):
+    """Write a database as the original code left it: guides, search rows,
+    a diagram, a step flow and a shared bookmark, at user_version 0."""
+    conn = sqlite3.connect(str(path))
+    conn.executescript(BASELINE_SCHEMA)
+    for guide_id, title, topics, urgency, boost in BASELINE_GUIDES:
+        body = f"## {title}\n\nKeep the tray clean and the kitten calm."
+        conn.execute(
+            "INSERT INTO guides VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (guide_id, title, f"All about {title.lower()}.", body, json.dumps(topics), 8, 16,
+             urgency, json.dumps(["Like a new flatmate"]), json.dumps(["Be patient"]),
+             json.dumps(["Shout"]), "2024-01-01T00:00:00"),
+        )
+        conn.execute(
+            "INSERT INTO search_index VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (guide_id, title, body, " ".join(topics), "8-16", topics[0], boost),
+        )
+    conn.execute(
+        "INSERT INTO diagrams VALUES (?, ?, ?, ?, ?, ?)",
+        ("tray-layout", "litter-basics", "tray.png", "A litter tray", "Tray layout",
+         json.dumps(["scoop-here"])),
+    )
+    conn.execute("INSERT INTO step_flows VALUES ('first-week', 'First Week', 'Settling in', 0)")
+    conn.execute(
+        "INSERT INTO steps VALUES ('set-up-tray', 'first-week', 'Set up the tray', "
+        "'[\"Pick a quiet corner\"]', '[]', '5 min', '[]', '', 1)"
+    )
+    conn.execute("INSERT INTO checklist_items VALUES ('buy-litter', 'set-up-tray', 'Buy litter', 0)")
+    conn.execute("INSERT INTO bookmarks VALUES ('night-zoomies', '2024-01-02T09:00:00')")
+    conn.commit()
+    conn.close()
+
+
+class MigrationTests(unittest.TestCase):
+    """Opening a database created before migrations runs every one of them."""
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.path = self.directory / "kitten_guide.db"
+        _seed_baseline(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_baseline_database_upgrades_in_place(self):
+        db = KittenGuideDB(str(self.path))
+        try:
+            self.assertEqual(db.schema_version(), SCHEMA_VERSION)
+
+            self.assertEqual(
+                {summary.id for summary in db.get_guide_summaries()},
+                {guide_id for guide_id, *_ in BASELINE_GUIDES},
+            )
+            guide = db.get_guide("litter-basics")
+            self.assertEqual(guide.topics, ["Litter", "Onboarding"])
+            self.assertEqual([diagram.id for diagram in db.get_diagrams(["litter-basics"])["litter-basics"]],
+                             ["tray-layout"])
+
+            # Bookmarks from before users existed are kept for the default user
+            self.assertEqual([summary.id for summary in db.get_bookmarked_summaries(DEFAULT_USER_ID)],
+                             ["night-zoomies"])
+
+            # Derived tables are filled in for the guides already stored
+            self.assertEqual([summary.id for summary in db.get_related("litter-basics", k=3)],
+                             ["litter-accidents"])
+            self.assertIn("litter-basics", {result.guide.id for result in db.search_guides("tray")})
+            self.assertEqual(db.guide_count(topic="Litter"), 2)
+            self.assertEqual(db.guide_count(age_weeks=12), 3)
+
+            flow = db.get_step_flow("first-week")
+            self.assertEqual([step.id for step in flow.steps], ["set-up-tray"])
+        finally:
+            db.close()
+
+    def test_upgraded_database_reopens_without_changes(self):
+        KittenGuideDB(str(self.path)).close()
+        db = KittenGuideDB(str(self.path))
+        try:
+            self.assertEqual(db.schema_version(), SCHEMA_VERSION)
+            self.assertEqual(len(db.get_guide_summaries()), len(BASELINE_GUIDES))
+        finally:
+            db.close()
+
+
+class QueryPlanTests(unittest.TestCase):
+    """EXPLAIN QUERY PLAN for the module's hot queries names the index that serves them."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = Path(tempfile.mkdtemp())
+        cls.db = KittenGuideDB(str(cls.directory / "kitten_guide.db"))
+        sync_content_pack(cls.db)
+        sync_step_flows(cls.db)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        shutil.rmtree(cls.directory)
+
+    def assertPlanUses(self, sql, params, *indexes):
+        """Every index in indexes serves sql, and nothing is sorted in a temp B-tree."""
+        plan = self.db.explain(sql, params)
+        for index in indexes:
+            self.assertTrue(any(index in step for step in plan), f"{index} not used: {plan}")
+        self.assertFalse(any("TEMP B-TREE" in step for step in plan), f"sorts in a temp B-tree: {plan}")
+
+    def test_listing_page_walks_listing_index(self):
+        self.assertPlanUses(f"""
+            SELECT {_summary_columns('g')} FROM guides g
+            WHERE (g.urgency_rank, g.title, g.id) > (?, ?, ?)
+            ORDER BY g.urgency_rank, g.title, g.id LIMIT ?
+        """, (-2, "Litter", "litter", 20), "idx_guides_listing")
+
+    def test_topic_count_reads_topic_index(self):
+        self.assertPlanUses("SELECT COUNT(*) FROM guide_topics WHERE topic = ?", ("Litter",),
+                            "idx_guide_topics_topic")
+
+    def test_age_filter_searches_rtree(self):
+        plan = self.db.explain(
+            "SELECT COUNT(*) FROM guide_ages WHERE age_min <= ? AND age_max >= ?", (9, 9)
+        )
+        self.assertTrue(any("guide_ages VIRTUAL TABLE INDEX" in step for step in plan), plan)
+
+    def test_urgency_filter_reads_urgency_index(self):
+        self.assertPlanUses("SELECT id FROM guides g WHERE g.urgency = ?", ("Now",),
+                            "idx_guides_urgency")
+
+    def test_diagrams_by_guide_read_guide_index(self):
+        self.assertPlanUses("""
+            SELECT guide_id, id, asset_ref, alt, caption, hotspots
+            FROM diagrams WHERE guide_id IN (?, ?) ORDER BY guide_id, rowid
+        """, ("first-24-hours", "emergency-vet-now"), "idx_diagrams_guide_id")
+
+    def test_step_flow_reads_step_and_checklist_indexes(self):
+        plan = self.db.explain("""
+            SELECT f.id, s.id, c.id
+            FROM step_flows f
+            LEFT JOIN steps s ON s.flow_id = f.id
+            LEFT JOIN checklist_items c ON c.step_id = s.id
+            WHERE f.id = ?
+            ORDER BY s.step_order, c.item_order
+        """, ("kitten-ops-manual",))
+        for index in ("idx_steps_flow_id", "idx_checklist_items_step_id"):
+            self.assertTrue(any(index in step for step in plan), f"{index} not used: {plan}")
+
+    def test_bookmark_page_walks_user_index(self):
+        self.assertPlanUses(f"""
+            SELECT {_summary_columns('g')} FROM bookmarks b
+            JOIN guides g ON g.id = b.guide_id
+            WHERE b.user_id = ? AND (b.created_at, b.guide_id) < (?, ?)
+            ORDER BY b.created_at DESC, b.guide_id DESC LIMIT ?
+        """, (DEFAULT_USER_ID, "2024-01-02", "zzz", 20), "idx_bookmarks_user_created")
+
+    def test_related_guides_read_rank_index(self):
+        self.assertPlanUses(f"""
+            SELECT {_summary_columns('g')}
+            FROM related_guides r JOIN guides g ON g.id = r.related_id
+            WHERE r.guide_id = ? ORDER BY r.score DESC, r.related_id LIMIT ?
+        """, ("first-24-hours", 3), "idx_related_guides_rank")
+
+    def test_related_refresh_reads_topic_key_index(self):
+        self.assertPlanUses("""
+            SELECT id FROM guides
+            WHERE topic_key = ? AND urgency_rank = ? ORDER BY id LIMIT ?
+        """, ("Litter", 0, 11), "idx_guides_topic_key")
+
+    def test_suggestions_prefix_is_a_range_scan(self):
+        plan = self.db.explain(
+            "SELECT display, kind, guides FROM suggestions WHERE term >= ? AND term < ?",
+            ("lit", "liu"),
+        )
+        self.assertTrue(any(step.startswith("SEARCH suggestions") for step in plan), plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Static page furniture shared by the Streamlit pages.
+
+Page scripts re-run top to bottom on every interaction, so stylesheets and
+long copy lists live here instead: the module is imported once per process,
+and each stylesheet is read from styles/ once and reused.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import streamlit as st
+
+STYLES_DIR = Path(__file__).resolve().parent / "styles"
+
+
+@lru_cache(maxsize=None)
+def stylesheet(name: str) -> str:
+    """The <style> block for styles/<name>.css, read on first use."""
+    css = (STYLES_DIR / f"{name}.css").read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+
+def inject_css(name: str):
+    """Add a page's stylesheet to the current run."""
+    st.markdown(stylesheet(name), unsafe_allow_html=True)
+
+
+# Cards rendered per page of a listing or search
+PAGE_SIZE = 10
+
+
+class Pager:
+    """Keyset pagination for one listing, remembered in session state.
+    
+    The session keeps the cursor each visited page started after, so Next
+    pushes the cursor of the last card shown and Previous pops back to the
+    page before. When `scope` (the query or filters) changes, paging starts
+    again from the first page.
+    """
+    
+    def __init__(self, key: str, scope: Hashable = None, page_size: int = PAGE_SIZE):
+        self.key = key
+        self.page_size = page_size
+        state = st.session_state.get(key)
+        if not state or state["scope"] != scope:
+            state = {"scope": scope, "cursors": [None]}
+            st.session_state[key] = state
+        self.cursors: List[Optional[tuple]] = state["cursors"]
+    
+    @property
+    def after(self) -> Optional[tuple]:
+        """Cursor the current page starts after (None on the first page)."""
+        return self.cursors[-1]
+    
+    @property
+    def limit(self) -> int:
+        """Rows to fetch: one page plus one more, to tell whether a next page exists."""
+        return self.page_size + 1
+    
+    @property
+    def number(self) -> int:
+        return len(self.cursors)
+    
+    def split(self, rows: Sequence) -> Tuple[Sequence, bool]:
+        """The rows to render from a fetch of `limit` rows, and whether there are more."""
+        return rows[:self.page_size], len(rows) > self.page_size
+    
+    def controls(self, next_cursor: Optional[tuple], has_more: bool, total: Optional[int] = None):
+        """Previous / page n of m / Next, under the cards."""
+        if self.number == 1 and not has_more:
+            return
+        previous_col, label_col, next_col = st.columns([1, 2, 1])
+        with previous_col:
+            st.button("← Previous", key=f"{self.key}_previous", disabled=self.number == 1,
+                      on_click=self.cursors.pop, use_container_width=True)
+        with label_col:
+            pages = f" of {-(-total // self.page_size)}" if total is not None else ""
+            st.markdown(f"<p style='text-align:center'>Page {self.number}{pages}</p>",
+                        unsafe_allow_html=True)
+        with next_col:
+            st.button("Next →", key=f"{self.key}_next", disabled=not has_more,
+                      on_click=self.cursors.append, args=(next_cursor,), use_container_width=True)
+
+
+# ── Home page: cat wisdom pool ─────────────────────────────────────────────────
+CAT_WISDOMS = [
+    "🐾 *\"A kitten that hides under the bed is not plotting your downfall — they're just terrified. Give it 48 hours.\"*",
+    "🐾 *\"Your kitten does not hate you. They hate the new smell of everything, including you. This is temporary.\"*",
+    "🐾 *\"Zoomies at 2am are not a personal attack. They are a feature, not a bug. Play before bed to patch it.\"*",
+    "🐾 *\"The litter tray is a privilege, not a right. Keep it clean or accept the consequences on your duvet.\"*",
+    "🐾 *\"Hands are not toys. Hands are sacred. Your future self will thank you for establishing this rule now.\"*",
+    "🐾 *\"Cats do not meow at each other. They only meow at humans. Congratulations — you have been accepted.\"*",
+    "🐾 *\"If your kitten brings you a toy, they are teaching you to hunt. Be grateful. Pretend to be impressed.\"*",
+    "🐾 *\"Slow blinking back at a cat is the feline equivalent of a firm handshake and a genuine smile.\"*",
+    "🐾 *\"A purring kitten on your laptop is not an inconvenience. It is a privilege. Adjust your posture.\"*",
+    "🐾 *\"The cardboard box you were going to recycle is now a palace. Accept this. Order more things online.\"*",
+    "🐾 *\"Kittens sleep 16 hours a day. Humans average 7. They are clearly doing something right.\"*",
+    "🐾 *\"If a kitten shows you their belly, it is a test of your self-control. You will almost certainly fail.\"*",
+]
+
+
+# ── Home page: ASCII cat art ───────────────────────────────────────────────────
+CAT_ART = r"""
+   /\_____/\
+  /  o   o  \
+ ( ==  ^  == )
+  )         (
+ (           )
+( (  )   (  ) )
+(__(__)___(__)__)
+"""
+
+
+# ── Home page: "Where to next?" cards (icon, name, description, page) ──────────
+NAV_ITEMS = [
+    ("📋", "Kitten Ops Manual", "Step-by-step onboarding — start here if the kitten arrived today", "pages/0_kitten_ops_manual.py"),
+    ("🔍", "Search",            "Find help for a specific crisis at 2am",                          "pages/1_search.py"),
+    ("📖", "Library",           "Browse every guide by topic — no panic required",                 "pages/2_library.py"),
+    ("⭐", "Saved",             "Your bookmarked guides — quick access in an emergency",            "pages/3_saved.py"),
+    ("🆘", "Emergency",        "When to ring the vet RIGHT NOW — keep this bookmarked",            "pages/4_emergency.py"),
+]
+
+
+# ── Home page: sidebar cat facts (rotate hourly) ───────────────────────────────
+CAT_FACTS = [
+    "Cats can make over 100 different sounds. Dogs can only make about 10.",
+    "A group of kittens is called a *kindle*. A group of adult cats is a *clowder*.",
+    "Cats spend 70% of their lives asleep. They are basically furry philosophers.",
+    "Your cat's nose print is unique — like a human fingerprint, but cuter.",
+    "Cats can't taste sweetness. They have no sweet taste receptors at all.",
+    "The technical term for a cat's hairball is a *trichobezoar*. It sounds more impressive than it is.",
+    "Cats always land on their feet due to a reflex called the *righting reflex* — but please don't test this.",
+    "Ancient Egyptians shaved their eyebrows in mourning when their cat died.",
+    "A cat called Stubbs was the mayor of Talkeetna, Alaska for 20 years.",
+    "Cats have 32 muscles in each ear. You have 6. They can hear you opening a crisp packet from two floors up.",
+]
+
+
+# ── Kitten Ops Manual: ranks by steps completed ────────────────────────────────
+RANKS = [
+    (0,  "🥚 Total Beginner",         "You've read the title. Respect."),
+    (2,  "🐣 Nervous New Parent",      "Two steps in. The kitten is alive. Progress!"),
+    (4,  "😬 Cautiously Optimistic",   "Four steps done. The litter tray situation is improving."),
+    (6,  "🙂 Getting the Hang of It",  "Six steps complete. Your kitten tolerates you now."),
+    (8,  "😎 Seasoned Kitten Wrangler","Eight steps! You can now locate the kitten in under 3 minutes."),
+    (10, "🏆 Certified Cat Butler",    "All 10 steps! Your kitten has accepted you as staff."),
+]